@@ -0,0 +1,89 @@
+"""Shared, pooled ``httpx.AsyncClient`` instances for outbound calls.
+
+Every outbound caller (LLM SDKs, Whisper STT, Google OAuth) borrows a
+long-lived client from here instead of building its own, so connections
+and TLS sessions are kept alive and reused across requests.  Pools are
+named so that slow LLM streams cannot exhaust the connections used by,
+say, the login flow.  HTTP/2 is enabled when the optional ``h2`` package
+is installed.
+
+LLM SDKs expect their own client class (``DefaultAsyncHttpxClient``), which
+may be built on a different httpx distribution than the one imported
+here; callers pass that class and the pool is configured with the
+matching ``Limits``/``Timeout`` types.
+
+The FastAPI ``lifespan`` closes all clients on shutdown via
+:func:`close_http_clients`.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import logging
+from types import ModuleType
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def http2_available() -> bool:
+    """Return ``True`` if HTTP/2 is enabled and ``h2`` is importable."""
+    return settings.http2_enabled and importlib.util.find_spec("h2") is not None
+
+
+def get_http_client(
+    name: str = "default",
+    client_class: type[httpx.AsyncClient] = httpx.AsyncClient,
+    timeout: float | None = None,
+) -> httpx.AsyncClient:
+    """Return the shared client for pool *name*, creating it on first use.
+
+    *client_class* and *timeout* (default ``settings.http_timeout_seconds``)
+    are only used when the pool is created, so each name should always be
+    requested with the same arguments.  A client that was
+    closed (e.g. by a previous app shutdown in the same process) is
+    replaced transparently.
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        httpx_module = _httpx_module(client_class)
+        client = client_class(
+            http2=http2_available(),
+            limits=httpx_module.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            ),
+            timeout=httpx_module.Timeout(
+                timeout or settings.http_timeout_seconds,
+                connect=settings.http_connect_timeout_seconds,
+            ),
+        )
+        _clients[name] = client
+        logger.debug("Created HTTP client pool %r (http2=%s)", name, http2_available())
+    return client
+
+
+def _httpx_module(client_class: type) -> ModuleType:
+    """Return the httpx package that *client_class*'s ``AsyncClient`` is from."""
+    for cls in client_class.__mro__:
+        if cls.__name__ == "AsyncClient":
+            return importlib.import_module(cls.__module__.partition(".")[0])
+    return httpx
+
+
+async def close_http_clients() -> None:
+    """Close every shared client; called from the app ``lifespan``."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:
+            logger.warning("Failed to close HTTP client", exc_info=True)
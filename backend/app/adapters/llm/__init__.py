@@ -1,11 +1,23 @@
 """LLM adapter layer -- provider-agnostic abstraction over Anthropic, OpenAI, etc."""
 
-from app.adapters.llm.base_llm import BaseLLMAdapter, LLMRequest, LLMResponse
-from app.adapters.llm.registry import LLMRegistry
+from app.adapters.llm.base_llm import (
+    BaseLLMAdapter,
+    LLMRequest,
+    LLMResponse,
+    PromptSegment,
+)
+from app.adapters.llm.coalescing import CoalescingAdapter
+from app.adapters.llm.registry import LLMRegistry, RoutedStream
+from app.adapters.llm.scheduler import FairScheduler, LLMQueueFullError
 
 __all__ = [
     "BaseLLMAdapter",
+    "CoalescingAdapter",
+    "FairScheduler",
+    "LLMQueueFullError",
     "LLMRequest",
     "LLMResponse",
+    "PromptSegment",
     "LLMRegistry",
+    "RoutedStream",
 ]
@@ -7,18 +7,36 @@ from typing import AsyncIterator
 
 import anthropic
 
+from app.adapters.http_client import get_http_client
 from app.adapters.llm.base_llm import BaseLLMAdapter, LLMRequest, LLMResponse
 
 logger = logging.getLogger(__name__)
 
+# The Messages API accepts at most four cache_control breakpoints per request
+_MAX_CACHE_BREAKPOINTS = 4
+
+
+def _with_cache_breakpoint(message: dict) -> dict:
+    """Return a copy of *message* whose last content block ends a cached prefix."""
+    content = message["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    last = {**content[-1], "cache_control": {"type": "ephemeral"}}
+    return {**message, "content": [*content[:-1], last]}
+
 
 class AnthropicAdapter(BaseLLMAdapter):
     """Adapter for the Anthropic Messages API."""
 
     provider_name: str = "anthropic"
 
-    def __init__(self, api_key: str) -> None:
-        self._client = anthropic.AsyncAnthropic(api_key=api_key)
+    def __init__(self, api_key: str, timeout: float = 120.0) -> None:
+        self._client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            http_client=get_http_client(
+                "anthropic", anthropic.DefaultAsyncHttpxClient, timeout
+            ),
+        )
 
     # ------------------------------------------------------------------
     # Text completion
@@ -28,14 +46,7 @@ class AnthropicAdapter(BaseLLMAdapter):
         """Perform a standard text completion."""
         kwargs = self._build_kwargs(request)
         response = await self._client.messages.create(**kwargs)
-
-        return LLMResponse(
-            content=response.content[0].text,
-            model_provider=self.provider_name,
-            model_name=request.model,
-            tokens_input=response.usage.input_tokens,
-            tokens_output=response.usage.output_tokens,
-        )
+        return self._to_response(response, request.model)
 
     # ------------------------------------------------------------------
     # Vision completion
@@ -81,18 +92,12 @@ class AnthropicAdapter(BaseLLMAdapter):
             temperature=request.temperature,
             max_tokens=request.max_tokens,
             system_prompt=request.system_prompt,
+            system_segments=request.system_segments,
         )
 
         kwargs = self._build_kwargs(vision_request)
         response = await self._client.messages.create(**kwargs)
-
-        return LLMResponse(
-            content=response.content[0].text,
-            model_provider=self.provider_name,
-            model_name=request.model,
-            tokens_input=response.usage.input_tokens,
-            tokens_output=response.usage.output_tokens,
-        )
+        return self._to_response(response, request.model)
 
     # ------------------------------------------------------------------
     # Streaming
@@ -128,13 +133,55 @@ class AnthropicAdapter(BaseLLMAdapter):
 
     @staticmethod
     def _build_kwargs(request: LLMRequest) -> dict:
-        """Translate an ``LLMRequest`` into ``messages.create()`` kwargs."""
+        """Translate an ``LLMRequest`` into ``messages.create()`` kwargs.
+
+        Structured system segments become text content blocks; segments
+        marked cacheable carry an ephemeral ``cache_control`` breakpoint so
+        the prefix up to and including them is served from the prompt cache
+        on subsequent calls.  The last of ``request.cached_messages`` gets a
+        breakpoint too, so the conversation so far is cached across turns.
+        Prefixes shorter than the model's minimum (1024 tokens, 2048 for
+        Haiku) are simply not cached.
+        """
+        breakpoints = 0
+        messages = request.messages
+        if 0 < request.cached_messages <= len(messages):
+            messages = list(messages)  # shallow copy
+            index = request.cached_messages - 1
+            messages[index] = _with_cache_breakpoint(messages[index])
+            breakpoints += 1
+
         kwargs: dict = {
             "model": request.model,
             "max_tokens": request.max_tokens,
             "temperature": request.temperature,
-            "messages": request.messages,
+            "messages": messages,
         }
-        if request.system_prompt:
+        if request.system_segments:
+            blocks: list[dict] = []
+            for segment in request.system_segments:
+                if not segment.text:
+                    continue
+                block: dict = {"type": "text", "text": segment.text}
+                if segment.cacheable and breakpoints < _MAX_CACHE_BREAKPOINTS:
+                    block["cache_control"] = {"type": "ephemeral"}
+                    breakpoints += 1
+                blocks.append(block)
+            if blocks:
+                kwargs["system"] = blocks
+        elif request.system_prompt:
             kwargs["system"] = request.system_prompt
         return kwargs
+
+    def _to_response(self, response: anthropic.types.Message, model: str) -> LLMResponse:
+        """Build an ``LLMResponse`` including prompt-cache token counts."""
+        usage = response.usage
+        return LLMResponse(
+            content=response.content[0].text,
+            model_provider=self.provider_name,
+            model_name=model,
+            tokens_input=usage.input_tokens,
+            tokens_output=usage.output_tokens,
+            tokens_cache_read=getattr(usage, "cache_read_input_tokens", None) or 0,
+            tokens_cache_write=getattr(usage, "cache_creation_input_tokens", None) or 0,
+        )
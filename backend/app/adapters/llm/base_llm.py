@@ -5,6 +5,18 @@ from dataclasses import dataclass
 from typing import AsyncIterator
 
 
+@dataclass
+class PromptSegment:
+    """One piece of a system prompt.
+
+    ``cacheable`` marks the end of a stable prefix that providers with
+    explicit prompt caching (Anthropic) may cache across requests.
+    """
+
+    text: str
+    cacheable: bool = False
+
+
 @dataclass
 class LLMRequest:
     """Encapsulates all parameters for a single LLM call."""
@@ -17,6 +29,18 @@ class LLMRequest:
     stream: bool = False
     image_base64: str | None = None
     image_media_type: str | None = None  # e.g. "image/jpeg"
+    # Optional structured form of the system prompt; when set it takes
+    # precedence over ``system_prompt``.
+    system_segments: list[PromptSegment] | None = None
+    # Number of leading ``messages`` repeated unchanged from the previous
+    # turn; providers with explicit prompt caching may cache through them.
+    cached_messages: int = 0
+
+    def system_text(self) -> str | None:
+        """Return the system prompt as a single string."""
+        if self.system_segments:
+            return "".join(segment.text for segment in self.system_segments)
+        return self.system_prompt
 
 
 @dataclass
@@ -28,6 +52,8 @@ class LLMResponse:
     model_name: str
     tokens_input: int = 0
     tokens_output: int = 0
+    tokens_cache_read: int = 0  # input tokens served from the prompt cache
+    tokens_cache_write: int = 0  # input tokens written to the prompt cache
 
 
 class BaseLLMAdapter(ABC):
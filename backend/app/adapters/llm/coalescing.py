@@ -0,0 +1,242 @@
+"""Single-flight request coalescing for LLM adapters.
+
+When many users ask the exact same thing at the same moment (a TV segment,
+a forwarded family message), identical requests are in flight together.
+``CoalescingAdapter`` wraps a provider adapter so that concurrent requests
+with the same fingerprint share one upstream call:
+
+* ``complete()`` callers await the same task and receive the same result
+  (or the same exception).  Only the caller that starts the upstream call
+  goes through admission control (see the ``run`` argument); joiners
+  share its slot.  When every caller has gone away the call is cancelled.
+* ``stream()`` subscribers are fanned out from one upstream stream; late
+  joiners first replay the deltas produced so far, then follow live.
+
+Requests are only merged while in flight -- nothing is cached once the
+upstream call finishes.  Vision requests are passed straight through.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from typing import AsyncIterator
+
+from app.adapters.llm.base_llm import BaseLLMAdapter, LLMRequest, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+# Wraps the upstream call of a new completion, e.g. in a scheduler slot
+UpstreamCall = Callable[[], Awaitable[LLMResponse]]
+UpstreamRunner = Callable[[UpstreamCall], Awaitable[LLMResponse]]
+
+
+def request_fingerprint(request: LLMRequest) -> str:
+    """Return a stable digest of everything that shapes the model output."""
+    payload = json.dumps(
+        [
+            request.model,
+            request.system_text(),
+            request.messages,
+            request.temperature,
+            request.max_tokens,
+        ],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _SharedCompletion:
+    """One upstream completion and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task[LLMResponse]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamBroadcast:
+    """Buffers one upstream stream and lets any number of readers follow it."""
+
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.subscribers = 0
+        self.producer: asyncio.Task | None = None
+        self._changed = asyncio.Condition()
+
+    async def publish(self, chunk: str) -> None:
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def finish(self, error: BaseException | None = None) -> None:
+        async with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Yield every chunk from the start, then new ones until done."""
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: len(self.chunks) > index or self.done
+                )
+                pending = self.chunks[index:]
+                finished = self.done
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+            if finished and index >= len(self.chunks):
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class CoalescingAdapter(BaseLLMAdapter):
+    """Wraps an adapter so identical concurrent requests share one call."""
+
+    def __init__(self, inner: BaseLLMAdapter) -> None:
+        self._inner = inner
+        self.provider_name = inner.provider_name
+        self._completions: dict[str, _SharedCompletion] = {}
+        self._streams: dict[str, _StreamBroadcast] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+
+    @property
+    def inner(self) -> BaseLLMAdapter:
+        """The wrapped provider adapter."""
+        return self._inner
+
+    # ------------------------------------------------------------------
+    # Text completion
+    # ------------------------------------------------------------------
+
+    async def complete(
+        self,
+        request: LLMRequest,
+        run: UpstreamRunner | None = None,
+    ) -> LLMResponse:
+        """Join an identical in-flight completion or start a new one.
+
+        A new upstream call is made through ``run(call)`` when given, so
+        the caller can wrap it (e.g. in a scheduler slot); callers joining
+        an in-flight completion do not invoke *run* at all.
+        """
+        key = request_fingerprint(request)
+        shared = self._completions.get(key)
+        if shared is None:
+            self.upstream_calls += 1
+
+            def call() -> Awaitable[LLMResponse]:
+                return self._inner.complete(request)
+
+            shared = _SharedCompletion(
+                asyncio.create_task(run(call) if run is not None else call())
+            )
+            self._completions[key] = shared
+            shared.task.add_done_callback(lambda _t: self._forget(key, shared))
+        else:
+            self.coalesced_calls += 1
+            logger.debug("Coalesced completion onto in-flight request %s", key[:12])
+
+        shared.waiters += 1
+        try:
+            # Shield so one caller going away does not cancel the shared call
+            return await asyncio.shield(shared.task)
+        finally:
+            shared.waiters -= 1
+            # Last caller gone before the upstream finished: stop paying for it
+            if shared.waiters == 0 and not shared.task.done():
+                self._forget(key, shared)
+                shared.task.cancel()
+
+    def _forget(self, key: str, shared: _SharedCompletion) -> None:
+        """Stop offering *shared* to new identical requests."""
+        if self._completions.get(key) is shared:
+            del self._completions[key]
+
+    # ------------------------------------------------------------------
+    # Vision completion
+    # ------------------------------------------------------------------
+
+    async def complete_vision(self, request: LLMRequest) -> LLMResponse:
+        """Pass through; image requests are practically never identical."""
+        return await self._inner.complete_vision(request)
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        """Subscribe to a shared upstream stream for identical requests."""
+        key = request_fingerprint(request)
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self.upstream_calls += 1
+            broadcast = _StreamBroadcast()
+            self._streams[key] = broadcast
+            broadcast.producer = asyncio.create_task(
+                self._produce(key, broadcast, request)
+            )
+        else:
+            self.coalesced_calls += 1
+            logger.debug("Coalesced stream onto in-flight request %s", key[:12])
+
+        broadcast.subscribers += 1
+        try:
+            async for chunk in broadcast.follow():
+                yield chunk
+        finally:
+            broadcast.subscribers -= 1
+            # Last reader gone before the upstream finished: stop paying for it
+            if broadcast.subscribers == 0 and not broadcast.done:
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+                if broadcast.producer is not None:
+                    broadcast.producer.cancel()
+
+    async def _produce(
+        self,
+        key: str,
+        broadcast: _StreamBroadcast,
+        request: LLMRequest,
+    ) -> None:
+        """Pump the upstream stream into *broadcast*."""
+        error: BaseException | None = None
+        try:
+            async for chunk in self._inner.stream(request):
+                await broadcast.publish(chunk)
+        except asyncio.CancelledError:
+            error = RuntimeError("Upstream stream cancelled")
+            raise
+        except Exception as exc:
+            error = exc
+        finally:
+            # New identical requests after this point start a fresh call
+            if self._streams.get(key) is broadcast:
+                del self._streams[key]
+            await asyncio.shield(broadcast.finish(error))
+
+    # ------------------------------------------------------------------
+    # Health check
+    # ------------------------------------------------------------------
+
+    async def health_check(self) -> bool:
+        return await self._inner.health_check()
+
+    def stats(self) -> dict:
+        """Return upstream vs. coalesced call counters."""
+        return {
+            "upstream_calls": self.upstream_calls,
+            "coalesced_calls": self.coalesced_calls,
+            "in_flight": len(self._completions) + len(self._streams),
+        }
@@ -0,0 +1,119 @@
+"""Per-provider health tracking: latency EWMA, error rate and circuit breaker."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+
+# Smoothing factor for the latency and error-rate EWMAs
+_ALPHA = 0.2
+
+# Number of recent successful latencies kept for percentile estimates
+_LATENCY_SAMPLES = 200
+
+# Minimum samples before a percentile is considered meaningful
+_MIN_SAMPLES_FOR_PERCENTILE = 20
+
+
+class LatencyTracker:
+    """EWMA and recent samples of one kind of latency."""
+
+    def __init__(self) -> None:
+        self.ewma: float | None = None
+        self._samples: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+        self.ewma = (
+            latency
+            if self.ewma is None
+            else (1 - _ALPHA) * self.ewma + _ALPHA * latency
+        )
+
+    def percentile(self, p: float) -> float | None:
+        """Return the *p*-quantile of recent samples, if there are enough."""
+        if len(self._samples) < _MIN_SAMPLES_FOR_PERCENTILE:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+
+class ProviderHealth:
+    """Rolling health statistics and a simple circuit breaker for one provider.
+
+    The breaker opens after ``failure_threshold`` consecutive failures and
+    stays open for ``cooldown_seconds``.  After the cooldown it is
+    half-open: traffic flows again, a success closes it, and the next
+    failure re-opens it straight away for another cooldown.
+
+    Full completion latency and stream time-to-first-token are different
+    quantities, so they are tracked separately; errors and the breaker
+    are shared.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float) -> None:
+        self._failure_threshold = max(failure_threshold, 1)
+        self._cooldown = cooldown_seconds
+
+        self.completion = LatencyTracker()
+        self.first_token = LatencyTracker()
+        self.error_rate = 0.0
+        self.successes = 0
+        self.failures = 0
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    # ------------------------------------------------------------------
+    # Recording outcomes
+    # ------------------------------------------------------------------
+
+    def record_success(self, latency: float, first_token: bool = False) -> None:
+        """Record a success; *latency* is time-to-first-token for streams."""
+        self.successes += 1
+        (self.first_token if first_token else self.completion).record(latency)
+        self.error_rate *= 1 - _ALPHA
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.error_rate = (1 - _ALPHA) * self.error_rate + _ALPHA
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self._failure_threshold:
+            self._open_until = time.monotonic() + self._cooldown
+
+    # ------------------------------------------------------------------
+    # Routing inputs
+    # ------------------------------------------------------------------
+
+    @property
+    def circuit_open(self) -> bool:
+        """``True`` while the breaker rejects traffic."""
+        return time.monotonic() < self._open_until
+
+    def score(self, first_token: bool = False) -> float:
+        """Lower is healthier: latency inflated by the recent error rate.
+
+        Uses time-to-first-token with *first_token*, else completion time.
+        """
+        latency = (self.first_token if first_token else self.completion).ewma
+        if latency is None:
+            return math.inf
+        return latency * (1 + 4 * self.error_rate)
+
+    def latency_percentile(self, p: float) -> float | None:
+        """Return the *p*-quantile of recent completion latencies."""
+        return self.completion.percentile(p)
+
+    def stats(self) -> dict:
+        return {
+            "latency_ewma_seconds": self.completion.ewma,
+            "latency_p95_seconds": self.completion.percentile(0.95),
+            "first_token_ewma_seconds": self.first_token.ewma,
+            "first_token_p95_seconds": self.first_token.percentile(0.95),
+            "error_rate": self.error_rate,
+            "successes": self.successes,
+            "failures": self.failures,
+            "circuit_open": self.circuit_open,
+        }
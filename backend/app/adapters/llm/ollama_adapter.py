@@ -7,6 +7,7 @@ from typing import AsyncIterator
 
 import openai
 
+from app.adapters.http_client import get_http_client
 from app.adapters.llm.base_llm import BaseLLMAdapter, LLMRequest, LLMResponse
 
 logger = logging.getLogger(__name__)
@@ -21,17 +22,21 @@ class OllamaAdapter(BaseLLMAdapter):
         self,
         base_url: str = "http://localhost:11434",
         vision_base_url: str | None = None,
+        timeout: float = 120.0,
     ) -> None:
         self._client = openai.AsyncOpenAI(
             base_url=f"{base_url}/v1",
             api_key="ollama",  # Ollama doesn't need a real key
+            http_client=get_http_client("ollama", openai.DefaultAsyncHttpxClient, timeout),
         )
         self._base_url = base_url
+        self._timeout = timeout
         # Vision can live on a separate Ollama instance (e.g. Docker container)
         vision_url = vision_base_url or base_url
         self._vision_client = openai.AsyncOpenAI(
             base_url=f"{vision_url}/v1",
             api_key="ollama",
+            http_client=get_http_client("ollama", openai.DefaultAsyncHttpxClient, timeout),
         )
 
     async def complete(self, request: LLMRequest) -> LLMResponse:
@@ -107,10 +112,11 @@ class OllamaAdapter(BaseLLMAdapter):
 
     async def health_check(self) -> bool:
         try:
-            import httpx
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(f"{self._base_url}/api/tags", timeout=5.0)
-                return resp.status_code == 200
+            client = get_http_client(
+                "ollama", openai.DefaultAsyncHttpxClient, self._timeout
+            )
+            resp = await client.get(f"{self._base_url}/api/tags", timeout=5.0)
+            return resp.status_code == 200
         except Exception:
             logger.warning("Ollama health-check failed (is Ollama running?)")
             return False
@@ -118,7 +124,8 @@ class OllamaAdapter(BaseLLMAdapter):
     @staticmethod
     def _build_messages(request: LLMRequest) -> list[dict]:
         messages: list[dict] = []
-        if request.system_prompt:
-            messages.append({"role": "system", "content": request.system_prompt})
+        system_prompt = request.system_text()
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
         messages.extend(request.messages)
         return messages
@@ -7,6 +7,7 @@ from typing import AsyncIterator
 
 import openai
 
+from app.adapters.http_client import get_http_client
 from app.adapters.llm.base_llm import BaseLLMAdapter, LLMRequest, LLMResponse
 
 logger = logging.getLogger(__name__)
@@ -17,8 +18,11 @@ class OpenAIAdapter(BaseLLMAdapter):
 
     provider_name: str = "openai"
 
-    def __init__(self, api_key: str) -> None:
-        self._client = openai.AsyncOpenAI(api_key=api_key)
+    def __init__(self, api_key: str, timeout: float = 120.0) -> None:
+        self._client = openai.AsyncOpenAI(
+            api_key=api_key,
+            http_client=get_http_client("openai", openai.DefaultAsyncHttpxClient, timeout),
+        )
 
     # ------------------------------------------------------------------
     # Text completion
@@ -43,6 +47,7 @@ class OpenAIAdapter(BaseLLMAdapter):
             model_name=request.model,
             tokens_input=usage.prompt_tokens if usage else 0,
             tokens_output=usage.completion_tokens if usage else 0,
+            tokens_cache_read=self._cached_tokens(usage),
         )
 
     # ------------------------------------------------------------------
@@ -96,6 +101,7 @@ class OpenAIAdapter(BaseLLMAdapter):
             model_name=request.model,
             tokens_input=usage.prompt_tokens if usage else 0,
             tokens_output=usage.completion_tokens if usage else 0,
+            tokens_cache_read=self._cached_tokens(usage),
         )
 
     # ------------------------------------------------------------------
@@ -139,11 +145,18 @@ class OpenAIAdapter(BaseLLMAdapter):
     # Internal helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _cached_tokens(usage: object) -> int:
+        """Return prompt tokens served from OpenAI's automatic prefix cache."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        return getattr(details, "cached_tokens", None) or 0
+
     @staticmethod
     def _build_messages(request: LLMRequest) -> list[dict]:
         """Prepend the system message (if any) to the conversation list."""
         messages: list[dict] = []
-        if request.system_prompt:
-            messages.append({"role": "system", "content": request.system_prompt})
+        system_prompt = request.system_text()
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
         messages.extend(request.messages)
         return messages
@@ -2,17 +2,61 @@
 
 from __future__ import annotations
 
-from app.adapters.llm.base_llm import BaseLLMAdapter
+import asyncio
+import dataclasses
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import AsyncIterator
+
+from app.adapters.llm.base_llm import BaseLLMAdapter, LLMRequest, LLMResponse
+from app.adapters.llm.coalescing import CoalescingAdapter
+from app.adapters.llm.health import ProviderHealth
+from app.adapters.llm.scheduler import (
+    FairScheduler,
+    LLMQueueFullError,
+    SchedulerTicket,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _most_relevant_error(errors: list[BaseException]) -> BaseException:
+    """Pick the error to raise after every provider was tried.
+
+    An upstream failure is more useful to report than a saturated queue.
+    """
+    for exc in reversed(errors):
+        if not isinstance(exc, LLMQueueFullError):
+            return exc
+    return errors[0]
 
 
 class LLMRegistry:
-    """Holds registered LLM adapters and provides look-up by provider name."""
+    """Holds registered LLM adapters and provides look-up by provider name.
+
+    Besides plain look-up, the registry tracks per-provider health (latency
+    EWMA, error rate, circuit breaker) and offers :meth:`complete` and
+    :meth:`stream`, which route to the healthiest provider, fail over to
+    the next one on errors and -- for completions -- can hedge a second
+    provider when the first is slower than its own p95.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, coalesce: bool = False) -> None:
         self._adapters: dict[str, BaseLLMAdapter] = {}
+        self._coalesce = coalesce
+        self._schedulers: dict[str, FairScheduler] = {}
+        self._health: dict[str, ProviderHealth] = {}
 
     def register(self, provider: str, adapter: BaseLLMAdapter) -> None:
-        """Register an adapter under *provider* (e.g. ``"anthropic"``)."""
+        """Register an adapter under *provider* (e.g. ``"anthropic"``).
+
+        When the registry was created with ``coalesce=True`` the adapter is
+        wrapped in a :class:`CoalescingAdapter`, so identical concurrent
+        requests share a single upstream call.
+        """
+        if self._coalesce and not isinstance(adapter, CoalescingAdapter):
+            adapter = CoalescingAdapter(adapter)
         self._adapters[provider] = adapter
 
     def get(self, provider: str) -> BaseLLMAdapter | None:
@@ -20,28 +64,362 @@ class LLMRegistry:
         return self._adapters.get(provider)
 
     def get_default(self) -> BaseLLMAdapter:
-        """Return the adapter that matches ``settings.llm_provider``.
+        """Return the preferred adapter according to :meth:`route`.
+
+        That is normally the one matching ``settings.llm_provider``; another
+        registered adapter is returned when the configured provider is
+        missing or its circuit breaker is open.  Raises ``RuntimeError``
+        when no adapters exist at all.
+        """
+        return self.route()[0]
+
+    def route(self, streaming: bool = False) -> list[BaseLLMAdapter]:
+        """Return registered adapters ordered by routing preference.
+
+        Providers with an open circuit always go last.  In ``"failover"``
+        mode the configured provider leads and the rest follow by health
+        score; in ``"latency"`` mode every provider is ordered by score,
+        with the configured one winning ties (including "no data yet").
+        Scores use time-to-first-token when *streaming*, else completion
+        latency.
+        """
+        from app.config import settings
+
+        if not self._adapters:
+            raise RuntimeError(
+                "No LLM adapters registered. "
+                "Set ANTHROPIC_API_KEY or OPENAI_API_KEY in your environment."
+            )
+
+        def sort_key(provider: str) -> tuple:
+            health = self.health(provider)
+            preferred = provider == settings.llm_provider
+            if settings.llm_routing == "latency":
+                return (health.circuit_open, health.score(streaming), not preferred)
+            return (health.circuit_open, not preferred, health.score(streaming))
+
+        return [self._adapters[p] for p in sorted(self._adapters, key=sort_key)]
+
+    def health(self, provider: str) -> ProviderHealth:
+        """Return the health tracker for *provider*."""
+        health = self._health.get(provider)
+        if health is None:
+            from app.config import settings
+
+            health = ProviderHealth(
+                failure_threshold=settings.llm_circuit_failure_threshold,
+                cooldown_seconds=settings.llm_circuit_cooldown_seconds,
+            )
+            self._health[provider] = health
+        return health
+
+    def scheduler(self, provider: str) -> FairScheduler:
+        """Return the admission scheduler guarding *provider*'s upstream calls."""
+        scheduler = self._schedulers.get(provider)
+        if scheduler is None:
+            from app.config import settings
+
+            scheduler = FairScheduler(
+                name=provider,
+                max_concurrency=settings.llm_max_concurrency,
+                max_queue=settings.llm_max_queue,
+                max_queued_per_user=settings.llm_max_queued_per_user,
+                max_wait_seconds=settings.llm_max_queue_wait_seconds,
+            )
+            self._schedulers[provider] = scheduler
+        return scheduler
+
+    # ------------------------------------------------------------------
+    # Routed calls
+    # ------------------------------------------------------------------
+
+    async def complete(
+        self,
+        request: LLMRequest,
+        user_id: str,
+        model_for: Callable[[str], str],
+        vision: bool = False,
+    ) -> LLMResponse:
+        """Run a (vision) completion on the healthiest provider.
+
+        *model_for* maps a provider name to the model to use there, so the
+        same request can be replayed on another provider.  On an upstream
+        error the next provider in :meth:`route` order is tried.  When
+        hedging is enabled and the first provider is still running after
+        its own p95 latency, the second provider is started too and the
+        first successful answer wins.
 
-        Falls back to the first available adapter if the configured provider
-        is not registered.  Raises ``RuntimeError`` when no adapters exist at
-        all.
+        Raises ``LLMQueueFullError`` if every provider's queue is saturated,
+        otherwise the last upstream error if every provider failed.
         """
         from app.config import settings
 
-        adapter = self._adapters.get(settings.llm_provider)
-        if adapter:
-            return adapter
+        candidates = self.route()
+        errors: list[BaseException] = []
 
-        # Fallback: return any available adapter
-        for a in self._adapters.values():
-            return a
+        if settings.llm_hedge_requests and len(candidates) > 1:
+            primary, secondary = candidates[0], candidates[1]
+            delay = self.health(primary.provider_name).latency_percentile(0.95)
+            if delay is not None:
+                try:
+                    return await self._hedged(
+                        primary, secondary, request, user_id, model_for, vision, delay
+                    )
+                except Exception as exc:  # both failed -- fall through
+                    errors.append(exc)
+                    candidates = candidates[2:]
 
-        raise RuntimeError(
-            "No LLM adapters registered. "
-            "Set ANTHROPIC_API_KEY or OPENAI_API_KEY in your environment."
-        )
+        for adapter in candidates:
+            try:
+                return await self._attempt(adapter, request, user_id, model_for, vision)
+            except LLMQueueFullError as exc:
+                # Saturation is expected under load; try the next provider quietly
+                errors.append(exc)
+            except Exception as exc:
+                logger.warning(
+                    "LLM provider %s failed; trying next provider: %r",
+                    adapter.provider_name,
+                    exc,
+                )
+                errors.append(exc)
+
+        raise _most_relevant_error(errors)
+
+    async def stream(
+        self,
+        request: LLMRequest,
+        user_id: str,
+        model_for: Callable[[str], str],
+    ) -> RoutedStream:
+        """Admit a stream on the first provider, in :meth:`route` order for
+        streaming, that has a free scheduler slot.
+
+        The returned :class:`RoutedStream` holds that slot and fails over
+        to later providers -- each behind its own scheduler -- if the
+        stream errors before its first delta.  Raises ``LLMQueueFullError``
+        before anything is streamed if every provider's queue is saturated.
+        """
+        candidates = self.route(streaming=True)
+        errors: list[LLMQueueFullError] = []
+        for index, adapter in enumerate(candidates):
+            try:
+                ticket = await self.scheduler(adapter.provider_name).acquire(user_id)
+            except LLMQueueFullError as exc:
+                errors.append(exc)
+                continue
+            return RoutedStream(
+                self, candidates[index:], ticket, request, user_id, model_for
+            )
+        raise errors[0]
+
+    async def _attempt(
+        self,
+        adapter: BaseLLMAdapter,
+        request: LLMRequest,
+        user_id: str,
+        model_for: Callable[[str], str],
+        vision: bool,
+    ) -> LLMResponse:
+        """One admission-controlled call to *adapter*, recording its health.
+
+        With a :class:`CoalescingAdapter`, only a caller that starts a new
+        upstream call takes a scheduler slot; identical requests joining
+        it share that slot instead of queueing for their own.
+        """
+        provider = adapter.provider_name
+        routed = dataclasses.replace(request, model=model_for(provider))
+
+        def admitted(
+            call: Callable[[], Awaitable[LLMResponse]],
+        ) -> Awaitable[LLMResponse]:
+            return self._admitted(provider, user_id, call)
+
+        if isinstance(adapter, CoalescingAdapter) and not vision:
+            return await adapter.complete(routed, run=admitted)
+        call = adapter.complete_vision if vision else adapter.complete
+        return await admitted(lambda: call(routed))
+
+    async def _admitted(
+        self,
+        provider: str,
+        user_id: str,
+        call: Callable[[], Awaitable[LLMResponse]],
+    ) -> LLMResponse:
+        """Run *call* in one of *provider*'s scheduler slots, recording health."""
+        async with self.scheduler(provider).slot(user_id):
+            started = time.monotonic()
+            try:
+                response = await call()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.health(provider).record_failure()
+                raise
+        self.health(provider).record_success(time.monotonic() - started)
+        return response
+
+    async def _hedged(
+        self,
+        primary: BaseLLMAdapter,
+        secondary: BaseLLMAdapter,
+        request: LLMRequest,
+        user_id: str,
+        model_for: Callable[[str], str],
+        vision: bool,
+        delay: float,
+    ) -> LLMResponse:
+        """Start *primary*; add *secondary* after *delay*; first success wins."""
+        tasks = {
+            asyncio.create_task(
+                self._attempt(primary, request, user_id, model_for, vision)
+            )
+        }
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                logger.info(
+                    "Hedging %s with %s after %.2fs",
+                    primary.provider_name,
+                    secondary.provider_name,
+                    delay,
+                )
+            # Start the hedge if the primary is slow or already failed
+            if not done or next(iter(done)).exception() is not None:
+                tasks.add(
+                    asyncio.create_task(
+                        self._attempt(secondary, request, user_id, model_for, vision)
+                    )
+                )
+
+            error: BaseException | None = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Return per-provider health, scheduler and coalescing counters."""
+        result: dict[str, dict] = {}
+        for provider, adapter in self._adapters.items():
+            entry: dict = {"health": self.health(provider).stats()}
+            if provider in self._schedulers:
+                entry["scheduler"] = self._schedulers[provider].stats()
+            if isinstance(adapter, CoalescingAdapter):
+                entry["coalescing"] = adapter.stats()
+            result[provider] = entry
+        return result
 
     @property
     def providers(self) -> list[str]:
         """Return the names of all registered providers."""
         return list(self._adapters.keys())
+
+
+class RoutedStream:
+    """A streamed completion admitted by :meth:`LLMRegistry.stream`.
+
+    Iterate it for text deltas.  :attr:`provider` and :attr:`model` name
+    the adapter and model serving the stream; they move on when the stream
+    fails over before its first delta, so read them after iterating.  The
+    scheduler slot is held only while an upstream stream is open -- call
+    :meth:`aclose` when the stream may not be iterated to the end.
+    """
+
+    def __init__(
+        self,
+        registry: LLMRegistry,
+        candidates: list[BaseLLMAdapter],
+        ticket: SchedulerTicket,
+        request: LLMRequest,
+        user_id: str,
+        model_for: Callable[[str], str],
+    ) -> None:
+        self._registry = registry
+        self._candidates = candidates
+        self._ticket: SchedulerTicket | None = ticket
+        self._request = request
+        self._user_id = user_id
+        self._model_for = model_for
+        self.provider = candidates[0].provider_name
+        self.model = model_for(self.provider)
+        self._deltas = self._run()
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._deltas
+
+    async def aclose(self) -> None:
+        """Stop the upstream stream and release its scheduler slot."""
+        try:
+            await self._deltas.aclose()
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        if self._ticket is not None:
+            self._ticket.release()
+            self._ticket = None
+
+    async def _run(self) -> AsyncIterator[str]:
+        """Yield deltas, failing over until one provider has produced text.
+
+        Once any text has been yielded the stream is committed to that
+        provider, and a later error is raised to the caller.
+        """
+        errors: list[BaseException] = []
+        try:
+            for adapter in self._candidates:
+                provider = adapter.provider_name
+                if self._ticket is None:
+                    try:
+                        self._ticket = await self._registry.scheduler(
+                            provider
+                        ).acquire(self._user_id)
+                    except LLMQueueFullError as exc:
+                        errors.append(exc)
+                        continue
+                self.provider = provider
+                self.model = self._model_for(provider)
+                routed = dataclasses.replace(self._request, model=self.model)
+                health = self._registry.health(provider)
+                started = time.monotonic()
+                yielded = False
+                try:
+                    async for chunk in adapter.stream(routed):
+                        if not yielded:
+                            # Time-to-first-token is what users feel
+                            health.record_success(
+                                time.monotonic() - started, first_token=True
+                            )
+                            yielded = True
+                        yield chunk
+                    return
+                except Exception as exc:
+                    health.record_failure()
+                    if yielded:
+                        raise
+                    logger.warning(
+                        "LLM provider %s failed to stream; trying next provider: %r",
+                        provider,
+                        exc,
+                    )
+                    errors.append(exc)
+                finally:
+                    self._release()
+        finally:
+            self._release()
+        raise _most_relevant_error(errors)
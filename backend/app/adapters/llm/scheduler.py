@@ -0,0 +1,215 @@
+"""Fair admission control for upstream LLM calls.
+
+Each provider gets a :class:`FairScheduler` with a fixed number of
+concurrent slots.  Callers that cannot start immediately wait in a
+per-user FIFO, and freed slots are handed out round-robin across users, so
+one account issuing a burst of requests cannot starve everybody else.
+
+Queues are bounded both globally and per user, and waiting is bounded in
+time.  When a request cannot be admitted, :class:`LLMQueueFullError` is
+raised straight away with a ``retry_after`` hint; the API layer turns it
+into ``429 Too Many Requests`` with a ``Retry-After`` header.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+# Number of recent queue-wait samples kept for percentile reporting
+_WAIT_SAMPLES = 1024
+
+
+class LLMQueueFullError(Exception):
+    """Raised when an LLM request cannot be admitted in time."""
+
+    def __init__(self, provider: str, retry_after: int, reason: str) -> None:
+        super().__init__(f"LLM queue for {provider!r} is saturated ({reason})")
+        self.provider = provider
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class SchedulerTicket:
+    """A granted slot; call :meth:`release` exactly once (extra calls are
+    ignored)."""
+
+    def __init__(self, scheduler: FairScheduler) -> None:
+        self._scheduler = scheduler
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._scheduler._release(time.monotonic() - self._started)
+
+
+class FairScheduler:
+    """Concurrency cap with round-robin fair queuing across user IDs."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        max_queued_per_user: int,
+        max_wait_seconds: float,
+    ) -> None:
+        self.name = name
+        self._max_concurrency = max(max_concurrency, 1)
+        self._max_queue = max_queue
+        self._max_queued_per_user = max_queued_per_user
+        self._max_wait = max_wait_seconds
+
+        self._active = 0
+        self._queued = 0
+        self._waiting: OrderedDict[str, deque[tuple[asyncio.Future[None], float]]] = (
+            OrderedDict()
+        )
+
+        # Metrics
+        self._avg_hold = 1.0  # EWMA of slot hold time, seconds
+        self._wait_samples: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    # ------------------------------------------------------------------
+    # Acquire / release
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(self, user_id: str) -> AsyncIterator[None]:
+        """Hold one slot for the duration of the ``async with`` block."""
+        ticket = await self.acquire(user_id)
+        try:
+            yield
+        finally:
+            ticket.release()
+
+    async def acquire(self, user_id: str) -> SchedulerTicket:
+        """Wait for a slot on behalf of *user_id*.
+
+        Raises :class:`LLMQueueFullError` immediately when the queue is
+        full, or after ``max_wait_seconds`` without being admitted.
+        """
+        if self._active < self._max_concurrency and self._queued == 0:
+            self._active += 1
+            self._record_wait(0.0)
+            return SchedulerTicket(self)
+
+        user_queue = self._waiting.get(user_id)
+        if self._queued >= self._max_queue:
+            self.rejected += 1
+            raise LLMQueueFullError(self.name, self._retry_after(), "queue full")
+        if user_queue is not None and len(user_queue) >= self._max_queued_per_user:
+            self.rejected += 1
+            raise LLMQueueFullError(self.name, self._retry_after(), "too many requests")
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        if user_queue is None:
+            user_queue = self._waiting[user_id] = deque()
+        user_queue.append((future, time.monotonic()))
+        self._queued += 1
+
+        try:
+            await asyncio.wait_for(future, timeout=self._max_wait)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Granted in the same iteration the wait timed out
+                self._release(0.0)
+            else:
+                self._forget(user_id, future)
+            self.timed_out += 1
+            raise LLMQueueFullError(
+                self.name, self._retry_after(), "queue wait timed out"
+            ) from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled -- hand the slot back
+                self._release(0.0)
+            else:
+                self._forget(user_id, future)
+            raise
+        return SchedulerTicket(self)
+
+    def _release(self, held_seconds: float) -> None:
+        """Free a slot and pass it to the next user in round-robin order."""
+        if held_seconds > 0:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held_seconds
+        self._active -= 1
+
+        while self._waiting and self._active < self._max_concurrency:
+            user_id, user_queue = next(iter(self._waiting.items()))
+            future, enqueued_at = user_queue.popleft()
+            self._queued -= 1
+            if user_queue:
+                self._waiting.move_to_end(user_id)
+            else:
+                del self._waiting[user_id]
+            if future.done():
+                continue
+            self._active += 1
+            self._record_wait(time.monotonic() - enqueued_at)
+            future.set_result(None)
+
+    def _forget(self, user_id: str, future: asyncio.Future[None]) -> None:
+        """Remove a waiter that gave up before being granted a slot."""
+        user_queue = self._waiting.get(user_id)
+        if not user_queue:
+            return
+        for entry in user_queue:
+            if entry[0] is future:
+                user_queue.remove(entry)
+                self._queued -= 1
+                break
+        if not user_queue:
+            del self._waiting[user_id]
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _record_wait(self, seconds: float) -> None:
+        self.admitted += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self._wait_samples.append(seconds)
+
+    def _retry_after(self) -> int:
+        """Rough seconds until a new request would likely be admitted."""
+        backlog = (self._queued + 1) / self._max_concurrency
+        return max(1, math.ceil(self._avg_hold * backlog))
+
+    def stats(self) -> dict:
+        """Return queue depth, admission counters and queue-wait times."""
+        samples = sorted(self._wait_samples)
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "max_concurrency": self._max_concurrency,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queue_wait_seconds_total": self.wait_seconds_total,
+            "queue_wait_seconds_max": self.wait_seconds_max,
+            "queue_wait_seconds_p50": percentile(0.50),
+            "queue_wait_seconds_p95": percentile(0.95),
+        }
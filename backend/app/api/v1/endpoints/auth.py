@@ -1,7 +1,6 @@
 """Authentication endpoints: register, login, refresh, profile."""
 
 import json
-import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
@@ -12,11 +11,16 @@ from app.middleware.auth import (
     create_access_token,
     create_refresh_token,
     decode_token,
+    check_token_version,
     get_current_user,
     hash_password,
+    revoke_tokens,
+    token_claims,
     verify_password,
 )
 from app.models.user import User
+from app.services.password_hasher import UNUSABLE_PASSWORD_HASH
+from app.services.user_cache import user_cache
 from app.schemas.auth import (
     AccessibilitySettingsUpdate,
     LoginRequest,
@@ -52,7 +56,7 @@ async def register(
 
     user = User(
         email=body.email,
-        password_hash=hash_password(body.password),
+        password_hash=await hash_password(body.password),
         display_name=body.display_name,
     )
     session.add(user)
@@ -73,14 +77,14 @@ async def login(
     result = await session.execute(select(User).where(User.email == body.email))
     user = result.scalar_one_or_none()
 
-    if user is None or not verify_password(body.password, user.password_hash):
+    if user is None or not await verify_password(body.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data=token_claims(user))
+    refresh_token = create_refresh_token(data=token_claims(user))
 
     return TokenResponse(
         access_token=access_token,
@@ -112,7 +116,7 @@ async def refresh(
             detail="Token missing subject claim",
         )
 
-    # Verify the user still exists
+    # Verify the user still exists and has not revoked the token
     result = await session.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if user is None:
@@ -120,9 +124,10 @@ async def refresh(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+    check_token_version(payload, user)
 
-    access_token = create_access_token(data={"sub": user.id})
-    new_refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data=token_claims(user))
+    new_refresh_token = create_refresh_token(data=token_claims(user))
 
     return TokenResponse(
         access_token=access_token,
@@ -152,10 +157,23 @@ async def update_accessibility(
     current_user.accessibility_settings = json.dumps(body.accessibility_settings)
     session.add(current_user)
     await session.commit()
+    user_cache.invalidate(current_user.id)
     await session.refresh(current_user)
     return current_user
 
 
+# ── POST /auth/logout-all ─────────────────────────────────────────────────
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> None:
+    """Revoke every token issued to the authenticated user, on all devices."""
+    await revoke_tokens(session, current_user)
+
+
 # ── GET /auth/oauth/google ────────────────────────────────────────────
 
 
@@ -201,18 +219,18 @@ async def oauth_google_callback(
     user = result.scalar_one_or_none()
 
     if user is None:
-        # Auto-register via OAuth -- use a random password hash since they'll login via Google
+        # Auto-register via OAuth -- they log in via Google, so no password
         user = User(
             email=user_info.email,
-            password_hash=hash_password(uuid.uuid4().hex),
+            password_hash=UNUSABLE_PASSWORD_HASH,
             display_name=user_info.name,
         )
         session.add(user)
         await session.commit()
         await session.refresh(user)
 
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data=token_claims(user))
+    refresh_token = create_refresh_token(data=token_claims(user))
 
     return TokenResponse(
         access_token=access_token,
@@ -247,15 +265,15 @@ async def dev_session(
     if user is None:
         user = User(
             email=dev_email,
-            password_hash=hash_password("devpassword123"),
+            password_hash=await hash_password("devpassword123"),
             display_name="Dev User",
         )
         session.add(user)
         await session.commit()
         await session.refresh(user)
 
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data=token_claims(user))
+    refresh_token = create_refresh_token(data=token_claims(user))
 
     return TokenResponse(
         access_token=access_token,
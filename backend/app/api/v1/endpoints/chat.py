@@ -1,6 +1,7 @@
 """Chat endpoint -- processes user messages through the LLM pipeline."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.adapters.llm.registry import LLMRegistry
@@ -40,3 +41,38 @@ async def chat(
         llm_registry=llm_registry,
         locale=body.locale,
     )
+
+
+@router.post("/stream")
+async def chat_stream(
+    body: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    llm_registry: LLMRegistry = Depends(get_llm_registry),
+) -> StreamingResponse:
+    """Send a message and stream the assistant response as Server-Sent Events.
+
+    Emits one ``token`` event (``{"text": ...}``) per text delta as the
+    model generates it, followed by a single ``done`` event whose payload
+    matches ``ChatResponse`` (``conversation_id``, ``has_steps``,
+    ``suggested_video`` and ``sources``).
+    """
+    if not body.message.strip():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Message cannot be empty",
+        )
+
+    events = await chat_service.stream_message(
+        session=session,
+        user_id=current_user.id,
+        message=body.message,
+        conversation_id=body.conversation_id,
+        llm_registry=llm_registry,
+        locale=body.locale,
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
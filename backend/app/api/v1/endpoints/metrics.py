@@ -0,0 +1,48 @@
+"""Operational metrics endpoint -- in-process counters for the hot paths."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.adapters.llm.registry import LLMRegistry
+from app.config import settings
+from app.dependencies import get_llm_registry
+from app.middleware.auth import get_current_user
+from app.models.user import User
+from app.services.answer_cache import answer_cache
+from app.services.password_hasher import password_hasher
+from app.services.search_cache import knowledge_search_cache, video_search_cache
+from app.services.token_cache import token_cache
+from app.services.user_cache import user_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def metrics(
+    llm_registry: LLMRegistry = Depends(get_llm_registry),
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Return cache, coalescing, LLM admission-queue and bcrypt pool counters.
+
+    Counters are per process; aggregate across workers when scraping.
+    Outside dev mode, only users listed in ``METRICS_ADMIN_EMAILS`` may
+    read them.
+    """
+    admins = {
+        email.strip().lower()
+        for email in settings.metrics_admin_emails.split(",")
+        if email.strip()
+    }
+    if not settings.dev_mode and current_user.email.lower() not in admins:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Metrics are restricted to administrators",
+        )
+    return {
+        "llm": llm_registry.stats(),
+        "answer_cache": answer_cache.stats(),
+        "knowledge_search_cache": knowledge_search_cache.stats(),
+        "video_search_cache": video_search_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+    }
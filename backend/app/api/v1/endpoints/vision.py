@@ -56,4 +56,5 @@ async def analyze_image(
         llm_registry=llm_registry,
         question=body.question,
         locale=body.locale,
+        user_id=current_user.id,
     )
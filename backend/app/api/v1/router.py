@@ -9,6 +9,7 @@ from app.api.v1.endpoints.knowledge import router as knowledge_router
 from app.api.v1.endpoints.videos import router as videos_router
 from app.api.v1.endpoints.stt import router as stt_router
 from app.api.v1.endpoints.tts import router as tts_router
+from app.api.v1.endpoints.metrics import router as metrics_router
 
 api_router = APIRouter(prefix="/api/v1")
 
@@ -19,3 +20,4 @@ api_router.include_router(knowledge_router)
 api_router.include_router(videos_router)
 api_router.include_router(stt_router)
 api_router.include_router(tts_router)
+api_router.include_router(metrics_router)
@@ -23,6 +23,13 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 60
     refresh_token_expire_days: int = 30
     algorithm: str = "HS256"
+    user_cache_enabled: bool = True  # skip the users SELECT on repeat requests
+    user_cache_max_entries: int = 4096
+    user_cache_ttl_seconds: float = 30.0  # staleness bound across workers
+    token_cache_enabled: bool = True  # skip re-verifying a reused JWT until exp
+    token_cache_max_entries: int = 4096
+    password_hash_workers: int = 2  # bcrypt threads, off the event loop
+    password_hash_max_queue: int = 32  # waiting bcrypt calls before 503
 
     # ── LLM provider ─────────────────────────────────────────────────────
     llm_provider: str = "anthropic"
@@ -35,6 +42,31 @@ class Settings(BaseSettings):
     anthropic_vision_model: str = "claude-sonnet-4-20250514"
     openai_vision_model: str = "gpt-4o"
 
+    # Share one upstream call between identical concurrent requests
+    llm_coalesce_requests: bool = True
+
+    # Provider routing: "failover" keeps llm_provider first while it is
+    # healthy; "latency" always prefers the provider with the best score.
+    llm_routing: str = "failover"
+    llm_hedge_requests: bool = False  # race a 2nd provider past the 1st's p95
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_cooldown_seconds: float = 30.0
+
+    # Admission control (per provider): concurrent calls, queue bounds
+    llm_max_concurrency: int = 8
+    llm_max_queue: int = 64
+    llm_max_queued_per_user: int = 2
+    llm_max_queue_wait_seconds: float = 20.0
+
+    # ── Outbound HTTP (shared connection pools) ───────────────────────
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 5.0
+    http_timeout_seconds: float = 30.0
+    llm_timeout_seconds: float = 120.0  # LLM pools (long, slow responses)
+    http2_enabled: bool = True  # used only when the "h2" package is installed
+
     # ── Ollama (local models) ──────────────────────────────────────────
     ollama_base_url: str = "http://localhost:11434"
     ollama_vision_base_url: str = "http://localhost:11435"
@@ -48,9 +80,36 @@ class Settings(BaseSettings):
 
     # ── Dev mode ───────────────────────────────────────────────────────
     dev_mode: bool = True  # When True, allows auto-login with dev session
+    metrics_admin_emails: str = ""  # comma-separated; read /metrics outside dev mode
+
+    # ── Chat history ───────────────────────────────────────────────────
+    chat_history_max_messages: int = 20  # turns sent to the LLM as context
+    chat_history_buffer_enabled: bool = True  # in-memory write-through buffer
+    chat_history_buffer_size: int = 1000  # max conversations kept in memory
+    chat_context_token_budget: int = 3000  # estimated input tokens per turn
+    chat_summary_enabled: bool = True  # fold older turns into a summary
+    chat_summary_max_tokens: int = 400
+
+    # ── Answer cache (first-turn how-to questions) ─────────────────────
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: int = 512
+    answer_cache_ttl_seconds: int = 3600
 
     # ── Knowledge base ────────────────────────────────────────────────────
     knowledge_base_dir: str = str(Path("data/knowledge_base"))
+    kb_ingest_workers: int = 0  # parser processes for large re-indexes (0 = CPU count)
+    kb_ingest_batch_rows: int = 500  # chunk rows per bulk INSERT
+    kb_watch_enabled: bool = False  # re-index live when files change on disk
+    kb_watch_debounce_seconds: float = 1.0  # quiet period before re-indexing
+    kb_watch_poll_seconds: float = 2.0  # scan interval without inotify (watchfiles)
+    rag_memory_index_enabled: bool = True  # in-process BM25 copy of the FTS index
+    rag_dense_enabled: bool = False  # hybrid FTS + dense retrieval; needs numpy
+    rag_dense_dim: int = 256  # hashed embedding size (changing it re-embeds)
+    rag_context_token_budget: int = 800  # prompt tokens for knowledge context
+    rag_min_relative_score: float = 0.35  # drop hits scoring under this x the best
+    rag_snippet_words: int = 0  # >0: send each hit's best N-word window only
+    search_cache_enabled: bool = True  # LRU of knowledge/video search results
+    search_cache_max_entries: int = 1024
     trusted_videos_path: str = str(Path("data/trusted_videos.yaml"))
 
 
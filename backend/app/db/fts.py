@@ -0,0 +1,106 @@
+"""External-content SQLite FTS5 indexes kept in sync by triggers.
+
+An :class:`FtsIndex` describes an FTS5 table that stores only the index
+and reads its columns back from a regular table by ``rowid``.  All
+indexes share one tokenizer, which folds text to lowercase ASCII so
+"cartão" and "cartao" match (see :func:`app.services.search_text.fold`).
+
+The index is keyed on the content table's implicit ``rowid``, which a
+``VACUUM`` may renumber; rebuild indexes after vacuuming.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+
+@dataclass(frozen=True)
+class FtsIndex:
+    """An FTS5 index *name* over *columns* of *content_table*."""
+
+    name: str
+    content_table: str
+    columns: tuple[str, ...]
+
+    @property
+    def ddl(self) -> str:
+        return (
+            f"CREATE VIRTUAL TABLE {self.name} USING fts5("
+            f"{', '.join(self.columns)}, content='{self.content_table}', "
+            f"content_rowid='rowid', tokenize='{FTS_TOKENIZER}')"
+        )
+
+    @property
+    def trigger_names(self) -> tuple[str, str, str]:
+        return (f"{self.name}_ai", f"{self.name}_ad", f"{self.name}_au")
+
+    @property
+    def triggers(self) -> tuple[str, str, str]:
+        """Keep the index in sync with every write to the content table.
+
+        The update trigger ignores columns FTS does not index.
+        """
+        columns = ", ".join(self.columns)
+        new_values = ", ".join(f"new.{column}" for column in self.columns)
+        old_values = ", ".join(f"old.{column}" for column in self.columns)
+        insert = (
+            f"INSERT INTO {self.name} (rowid, {columns}) "
+            f"VALUES (new.rowid, {new_values}); "
+        )
+        delete = (
+            f"INSERT INTO {self.name} ({self.name}, rowid, {columns}) "
+            f"VALUES ('delete', old.rowid, {old_values}); "
+        )
+        on_insert, on_delete, on_update = self.trigger_names
+        return (
+            f"CREATE TRIGGER {on_insert} "
+            f"AFTER INSERT ON {self.content_table} BEGIN {insert}END",
+            f"CREATE TRIGGER {on_delete} "
+            f"AFTER DELETE ON {self.content_table} BEGIN {delete}END",
+            f"CREATE TRIGGER {on_update} "
+            f"AFTER UPDATE OF {columns} ON {self.content_table} BEGIN "
+            f"{delete}{insert}END",
+        )
+
+    async def ensure(self, conn: AsyncConnection) -> None:
+        """Create the index, or replace one with an outdated definition.
+
+        A new index is built from the existing rows.  Triggers are
+        recreated every time so their definitions follow code changes.
+        """
+        result = await conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": self.name},
+        )
+        existing_sql = result.scalar()
+
+        created = False
+        if existing_sql != self.ddl:
+            if existing_sql is not None:
+                logger.info("Migrating %s to the current definition", self.name)
+                await conn.execute(text(f"DROP TABLE {self.name}"))
+            await conn.execute(text(self.ddl))
+            created = True
+
+        for name in self.trigger_names:
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        for trigger_sql in self.triggers:
+            await conn.execute(text(trigger_sql))
+
+        if created:
+            await self.rebuild(conn)
+
+    async def rebuild(self, conn: AsyncConnection) -> None:
+        """Re-index every row of the content table."""
+        await conn.execute(
+            text(f"INSERT INTO {self.name} ({self.name}) VALUES ('rebuild')")
+        )
+        logger.info("FTS5 index %s rebuilt", self.name)
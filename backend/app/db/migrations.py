@@ -0,0 +1,50 @@
+"""Lightweight, idempotent schema upgrades applied at startup.
+
+``Base.metadata.create_all`` creates missing tables but never alters
+existing ones, so columns and indexes added to a model after a database
+was first created are declared here and added when absent.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# (table, column, SQLite column definition)
+_ADDED_COLUMNS: list[tuple[str, str, str]] = [
+    ("conversations", "summary", "TEXT"),
+    ("conversations", "summarized_through", "DATETIME"),
+    ("knowledge_chunks", "embedding", "BLOB"),
+    ("knowledge_files", "chunker_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("users", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# (index name, table, indexed columns)
+_ADDED_INDEXES: list[tuple[str, str, str]] = [
+    ("ix_messages_conversation_created", "messages", "conversation_id, created_at"),
+    ("ix_knowledge_chunks_source_file", "knowledge_chunks", "source_file"),
+]
+
+
+async def upgrade_schema(engine: AsyncEngine) -> None:
+    """Add columns and indexes declared above that existing tables lack."""
+    async with engine.begin() as conn:
+        existing: dict[str, set[str]] = {}
+        for table, column, ddl in _ADDED_COLUMNS:
+            if table not in existing:
+                result = await conn.execute(text(f"PRAGMA table_info({table})"))
+                existing[table] = {row[1] for row in result.all()}
+            if column in existing[table]:
+                continue
+            await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+            existing[table].add(column)
+            logger.info("Added column %s.%s", table, column)
+
+        for name, table, columns in _ADDED_INDEXES:
+            await conn.execute(
+                text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+            )
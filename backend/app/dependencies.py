@@ -21,19 +21,25 @@ def get_llm_registry() -> LLMRegistry:
     :class:`LLMRegistry` is then injected via ``Depends(get_llm_registry)``
     in endpoint handlers.
     """
-    registry = LLMRegistry()
+    registry = LLMRegistry(coalesce=settings.llm_coalesce_requests)
 
     if settings.anthropic_api_key:
         registry.register(
             "anthropic",
-            AnthropicAdapter(api_key=settings.anthropic_api_key),
+            AnthropicAdapter(
+                api_key=settings.anthropic_api_key,
+                timeout=settings.llm_timeout_seconds,
+            ),
         )
         logger.info("Registered Anthropic LLM adapter")
 
     if settings.openai_api_key:
         registry.register(
             "openai",
-            OpenAIAdapter(api_key=settings.openai_api_key),
+            OpenAIAdapter(
+                api_key=settings.openai_api_key,
+                timeout=settings.llm_timeout_seconds,
+            ),
         )
         logger.info("Registered OpenAI LLM adapter")
 
@@ -47,6 +53,7 @@ def get_llm_registry() -> LLMRegistry:
                 OllamaAdapter(
                     base_url=settings.ollama_base_url,
                     vision_base_url=vision_url if vision_url != settings.ollama_base_url else None,
+                    timeout=settings.llm_timeout_seconds,
                 ),
             )
             logger.info(
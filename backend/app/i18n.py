@@ -47,6 +47,21 @@ TRANSLATIONS: dict[Locale, dict[str, str]] = {
             "precisa. Se a pergunta nao estiver relacionada ao contexto, "
             "responda com seu conhecimento geral.\n\n"
         ),
+        # ── Conversation summary ──────────────────────────────────────
+        "conversation_summary_header": (
+            "\n\n--- Resumo da conversa ate agora ---\n"
+        ),
+        "summary_system_prompt": (
+            "Voce resume conversas entre o NaviAI e uma pessoa idosa. "
+            "Atualize o resumo existente com as novas mensagens. Mantenha "
+            "fatos importantes, o que o usuario quer fazer, em que passo "
+            "parou e quaisquer dados que ele ja informou. Escreva no maximo "
+            "um paragrafo curto, em portugues brasileiro."
+        ),
+        "summary_request": (
+            "Resumo atual:\n{summary}\n\nNovas mensagens:\n{transcript}\n\n"
+            "Escreva o resumo atualizado."
+        ),
         # ── Fallback / error messages ─────────────────────────────────
         "chat_fallback": (
             "Desculpe, estou com dificuldade para responder agora. "
@@ -97,6 +112,21 @@ TRANSLATIONS: dict[Locale, dict[str, str]] = {
             "If the question is not related to the context, "
             "respond with your general knowledge.\n\n"
         ),
+        # ── Conversation summary ──────────────────────────────────────
+        "conversation_summary_header": (
+            "\n\n--- Conversation summary so far ---\n"
+        ),
+        "summary_system_prompt": (
+            "You summarize conversations between NaviAI and an elderly "
+            "person. Update the existing summary with the new messages. Keep "
+            "important facts, what the user wants to do, which step they "
+            "reached and any details they already provided. Write at most "
+            "one short paragraph, in English."
+        ),
+        "summary_request": (
+            "Current summary:\n{summary}\n\nNew messages:\n{transcript}\n\n"
+            "Write the updated summary."
+        ),
         # ── Fallback / error messages ─────────────────────────────────
         "chat_fallback": (
             "Sorry, I'm having trouble responding right now. "
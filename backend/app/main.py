@@ -4,35 +4,59 @@ import logging
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app.adapters.http_client import close_http_clients
+from app.adapters.llm.scheduler import LLMQueueFullError
 from app.api.v1.router import api_router
+from app.config import settings
+from app.db.migrations import upgrade_schema
 from app.db.session import engine, AsyncSessionLocal
+from app.dependencies import get_llm_registry
 from app.models import Base  # noqa: F401  – ensures all models are imported
 from app.services import rag_service, video_service
+from app.services.kb_watcher import kb_watcher
+from app.services.password_hasher import PasswordHasherBusyError, password_hasher
 
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
-    """Create database tables, initialise FTS5, and seed data on startup."""
+    """Create database tables, initialise FTS5, and seed data on startup.
+
+    With ``KB_WATCH_ENABLED``, also start the knowledge-base watcher.  On
+    shutdown, stop it and close the shared outbound HTTP connection pools.
+    """
     # 1. Create all ORM tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await upgrade_schema(engine)
 
-    # 2. Initialise the FTS5 virtual table for knowledge search
+    # 2. Initialise the FTS5 virtual tables for knowledge and video search
     await rag_service.init_fts(engine)
+    await video_service.init_video_fts(engine)
 
     # 3. Index knowledge-base markdown files and load trusted videos
     async with AsyncSessionLocal() as session:
         await rag_service.index_knowledge_base(session)
         await video_service.load_trusted_videos(session)
 
+    # 4. Optionally pick up knowledge-base edits without a restart
+    if settings.kb_watch_enabled:
+        kb_watcher.start()
+
     logger.info("NaviAI startup complete: knowledge base and videos ready")
     yield
 
+    await kb_watcher.stop()
+    password_hasher.shutdown()
+    # Adapters hold pooled clients; drop them together with the pools
+    await close_http_clients()
+    get_llm_registry.cache_clear()
+
 
 app = FastAPI(
     title="NaviAI API",
@@ -51,6 +75,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ── Error handlers ───────────────────────────────────────────────────────
+
+
+@app.exception_handler(LLMQueueFullError)
+async def llm_queue_full_handler(_request: Request, exc: LLMQueueFullError) -> JSONResponse:
+    """Reject saturated LLM requests quickly with 429 and a retry hint."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests, please try again shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(
+    _request: Request, exc: PasswordHasherBusyError
+) -> JSONResponse:
+    """Shed login and registration bursts instead of queueing without bound."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication is busy, please try again shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # ── Routers ───────────────────────────────────────────────────────────────
 
 app.include_router(api_router)
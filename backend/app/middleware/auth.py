@@ -3,37 +3,37 @@ the ``get_current_user`` FastAPI dependency."""
 
 from datetime import datetime, timedelta, timezone
 
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.db.session import get_async_session
 from app.models.user import User
+from app.services.password_hasher import password_hasher
+from app.services.token_cache import token_cache
+from app.services.user_cache import user_cache
 
 # ---------------------------------------------------------------------------
-# Password hashing (using bcrypt directly — passlib is incompatible with bcrypt>=4.1)
+# Password hashing (bcrypt on a bounded worker pool)
 # ---------------------------------------------------------------------------
 
 bearer_scheme = HTTPBearer()
 
 
-def hash_password(password: str) -> str:
-    """Return a bcrypt hash of *password*."""
-    pwd_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(pwd_bytes, salt).decode("utf-8")
+async def hash_password(password: str) -> str:
+    """Return a bcrypt hash of *password*, computed off the event loop."""
+    return await password_hasher.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify *plain_password* against a bcrypt *hashed_password*."""
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"),
-        hashed_password.encode("utf-8"),
-    )
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify *plain_password* against a bcrypt *hashed_password*.
+
+    Runs off the event loop; see :mod:`app.services.password_hasher`.
+    """
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
 # ---------------------------------------------------------------------------
@@ -66,12 +66,58 @@ def create_refresh_token(data: dict) -> str:
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
+def token_claims(user: User) -> dict:
+    """Return the identity claims to sign into *user*'s tokens.
+
+    ``ver`` is the user's current ``token_version``; see :func:`revoke_tokens`.
+    """
+    return {"sub": user.id, "ver": user.token_version}
+
+
+def check_token_version(payload: dict, user: User) -> None:
+    """Raise 401 if the token was issued before *user*'s last revocation.
+
+    Tokens issued before versions existed carry no ``ver`` claim; they
+    count as version 0, the column default, so they stay valid only
+    until the user's first revocation.
+    """
+    if payload.get("ver", 0) != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def revoke_tokens(session: AsyncSession, user: User) -> None:
+    """Invalidate every access and refresh token issued to *user* so far.
+
+    Takes effect immediately in this process; other workers notice once
+    their cached copy of the user expires (``user_cache_ttl_seconds``).
+    """
+    await session.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(token_version=User.token_version + 1)
+    )
+    await session.commit()
+    user_cache.invalidate(user.id)
+
+
 def decode_token(token: str) -> dict:
-    """Decode and verify a JWT.  Raises ``HTTPException`` on failure."""
+    """Decode and verify a JWT.  Raises ``HTTPException`` on failure.
+
+    Tokens verified before are answered from :data:`token_cache` until
+    they expire.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
+        token_cache.put(token, payload)
         return payload
     except JWTError:
         raise HTTPException(
@@ -91,7 +137,12 @@ async def get_current_user(
     session: AsyncSession = Depends(get_async_session),
 ) -> User:
     """Extract the Bearer token, decode the JWT, and return the ``User``
-    record from the database.  Raises 401 if anything fails."""
+    record from the database.  Raises 401 if anything fails.
+
+    Users are served from :data:`user_cache` when possible; the returned
+    instance is detached, so ``session.add`` it before changing it and
+    call ``user_cache.invalidate`` after committing.
+    """
     payload = decode_token(credentials.credentials)
 
     if payload.get("type") != "access":
@@ -109,14 +160,19 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    result = await session.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-
+    user = user_cache.get(user_id)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
+        generation = user_cache.generation
+        result = await session.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user_cache.put(user, generation)
+
+    check_token_version(payload, user)
     return user
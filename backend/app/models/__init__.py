@@ -5,6 +5,7 @@ from app.models.user import User
 from app.models.conversation import Conversation
 from app.models.message import Message
 from app.models.knowledge_chunk import KnowledgeChunk
+from app.models.knowledge_file import KnowledgeFile
 from app.models.trusted_video import TrustedVideo
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     "Conversation",
     "Message",
     "KnowledgeChunk",
+    "KnowledgeFile",
     "TrustedVideo",
 ]
@@ -1,6 +1,8 @@
 """Conversation model."""
 
-from sqlalchemy import ForeignKey, String, Text
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, IDMixin, TimestampMixin
@@ -15,6 +17,12 @@ class Conversation(Base, IDMixin, TimestampMixin):
         String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     title: Mapped[str] = mapped_column(Text, nullable=False, default="New Conversation")
+    # Running summary of older turns that no longer fit the context budget,
+    # and the ``created_at`` of the newest message folded into it.
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    summarized_through: Mapped[datetime | None] = mapped_column(
+        DateTime, nullable=True, default=None
+    )
 
     # Relationships
     user: Mapped["User"] = relationship(  # noqa: F821
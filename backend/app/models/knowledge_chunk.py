@@ -1,6 +1,6 @@
 """KnowledgeChunk model -- stores indexed chunks from knowledge-base markdown files."""
 
-from sqlalchemy import Integer, String, Text
+from sqlalchemy import Integer, LargeBinary, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base, IDMixin
@@ -11,8 +11,10 @@ class KnowledgeChunk(Base, IDMixin):
 
     __tablename__ = "knowledge_chunks"
 
-    source_file: Mapped[str] = mapped_column(String(255))
+    source_file: Mapped[str] = mapped_column(String(255), index=True)
     title: Mapped[str] = mapped_column(String(500))
     content: Mapped[str] = mapped_column(Text, nullable=False)
     chunk_index: Mapped[int] = mapped_column(Integer)
     keywords: Mapped[str | None] = mapped_column(Text)  # comma-separated
+    # float32 vector for hybrid retrieval (see services.dense_index)
+    embedding: Mapped[bytes | None] = mapped_column(LargeBinary)
@@ -0,0 +1,20 @@
+"""KnowledgeFile model -- manifest of indexed knowledge-base markdown files."""
+
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, IDMixin
+
+
+class KnowledgeFile(Base, IDMixin):
+    """Content hash and stat info of a markdown file as last indexed."""
+
+    __tablename__ = "knowledge_files"
+
+    source_file: Mapped[str] = mapped_column(String(255), unique=True)
+    content_hash: Mapped[str] = mapped_column(String(64))  # SHA-256 hex
+    mtime_ns: Mapped[int] = mapped_column(Integer)
+    size: Mapped[int] = mapped_column(Integer)
+    chunk_count: Mapped[int] = mapped_column(Integer, default=0)
+    # kb_ingest.CHUNKER_VERSION the chunks were produced with
+    chunker_version: Mapped[int] = mapped_column(Integer, default=0)
@@ -2,7 +2,7 @@
 
 import enum
 
-from sqlalchemy import Boolean, Enum, ForeignKey, String, Text
+from sqlalchemy import Boolean, Enum, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, IDMixin, TimestampMixin
@@ -20,6 +20,10 @@ class Message(Base, IDMixin, TimestampMixin):
     """A single message within a conversation."""
 
     __tablename__ = "messages"
+    __table_args__ = (
+        # Serves the bounded "last N messages of a conversation" query
+        Index("ix_messages_conversation_created", "conversation_id", "created_at"),
+    )
 
     conversation_id: Mapped[str] = mapped_column(
         String(36),
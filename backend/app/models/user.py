@@ -1,6 +1,6 @@
 """User model."""
 
-from sqlalchemy import String, Text
+from sqlalchemy import Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, IDMixin, TimestampMixin
@@ -19,6 +19,8 @@ class User(Base, IDMixin, TimestampMixin):
     accessibility_settings: Mapped[str | None] = mapped_column(
         Text, nullable=True, default=None
     )
+    # Copied into tokens as the ``ver`` claim; bumping it revokes them all
+    token_version: Mapped[int] = mapped_column(Integer, default=0)
 
     # Relationships
     conversations: Mapped[list["Conversation"]] = relationship(  # noqa: F821
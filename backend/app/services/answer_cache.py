@@ -0,0 +1,117 @@
+"""In-memory answer cache for repeated, history-independent chat questions.
+
+Many users ask the same handful of how-to questions against the same
+knowledge-base chunks.  When a turn carries no conversation history, the
+LLM output depends only on the question, the retrieved chunks, the locale
+and the model -- so identical turns can reuse a previous answer instead of
+paying for another completion.
+
+Entries expire after a TTL and the least-recently-used entry is evicted
+once the cache is full.  The whole cache is cleared whenever the knowledge
+base is re-indexed.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.config import settings
+
+AnswerKey = tuple[str, str, str, str, tuple[str, ...]]
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class CachedAnswer:
+    """A previously generated assistant answer."""
+
+    content: str
+    model_provider: str
+    model_name: str
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, strip accents and punctuation, and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", question.lower())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    stripped = _NON_WORD.sub(" ", stripped)
+    return _WHITESPACE.sub(" ", stripped).strip()
+
+
+def make_key(
+    question: str,
+    chunk_ids: Iterable[str],
+    locale: str,
+    provider: str,
+    model: str,
+) -> AnswerKey:
+    """Build the cache key for a history-independent chat turn."""
+    return (provider, model, locale, normalize_question(question), tuple(chunk_ids))
+
+
+def rekey(key: AnswerKey, provider: str, model: str) -> AnswerKey:
+    """Return *key* for the same turn answered by *provider* / *model*."""
+    _, _, locale, question, chunk_ids = key
+    return (provider, model, locale, question, chunk_ids)
+
+
+class AnswerCache:
+    """TTL + LRU cache of assistant answers with hit/miss counters."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: OrderedDict[AnswerKey, tuple[float, CachedAnswer]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: AnswerKey) -> CachedAnswer | None:
+        """Return the cached answer for *key*, or ``None`` on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, answer = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return answer
+
+    def put(self, key: AnswerKey, answer: CachedAnswer) -> None:
+        """Store *answer* under *key*, evicting the LRU entry when full."""
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after the knowledge base changes)."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+answer_cache = AnswerCache(
+    max_entries=settings.answer_cache_max_entries if settings.answer_cache_enabled else 0,
+    ttl_seconds=settings.answer_cache_ttl_seconds,
+)
@@ -2,25 +2,88 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.adapters.llm.base_llm import LLMRequest
-from app.adapters.llm.registry import LLMRegistry
+from app.adapters.llm.base_llm import LLMRequest, LLMResponse
+from app.adapters.llm.registry import LLMRegistry, RoutedStream
+from app.adapters.llm.scheduler import LLMQueueFullError
 from app.config import settings
+from app.db.session import AsyncSessionLocal
 from app.i18n import STEP_PATTERNS, t
 from app.models.conversation import Conversation
 from app.models.message import Message, MessageRole
 from app.schemas.chat import ChatResponse
 from app.services import rag_service, video_service
+from app.services.answer_cache import (
+    AnswerKey,
+    CachedAnswer,
+    answer_cache,
+    make_key,
+    rekey,
+)
+from app.services.context_builder import build_context
+from app.services.history_buffer import HistoryTurn, history_buffer
+from app.services.rag_context import select_rag_context
 
 logger = logging.getLogger(__name__)
 
 # Maximum number of conversation history messages to include as context
-_MAX_HISTORY_MESSAGES = 20
+_MAX_HISTORY_MESSAGES = settings.chat_history_max_messages
+
+# Upper bound on messages folded into the summary by one background pass
+_SUMMARY_BATCH_MESSAGES = 40
+
+# A pass only calls the LLM once this many messages have left the history
+# window unsummarized, so long conversations pay for a summary every few
+# turns rather than on each one
+_SUMMARY_MIN_MESSAGES = _SUMMARY_BATCH_MESSAGES // 4
+
+# Scheduler identity used for background summarization calls
+_SUMMARY_SCHEDULER_ID = "__summary__"
+
+_T = TypeVar("_T")
+
+# Conversations with a summary update in flight, and strong references to
+# the background tasks so they are not garbage-collected mid-run.
+_summaries_in_flight: set[str] = set()
+_background_tasks: set[asyncio.Task] = set()
+
+
+@dataclass
+class _PreparedTurn:
+    """Everything needed to call the LLM for one user turn."""
+
+    conversation_id: str
+    user_id: str
+    user_message: str
+    user_message_id: str
+    llm_registry: LLMRegistry
+    llm_request: LLMRequest
+    rag_chunks: list[dict]
+    video_suggestions: list[dict]
+    locale: str
+    kept_turns: int = 0  # history turns that fit the token budget
+    needs_summary: bool = False
+    cache_key: AnswerKey | None = None  # set for history-independent turns
+
+
+@dataclass
+class _RecentHistory:
+    """Recent turns of a conversation and where they came from."""
+
+    turns: list[HistoryTurn]
+    newest_message_id: str | None  # newest committed message, if any
+    buffered: bool  # served from the in-memory history buffer
 
 
 # ---------------------------------------------------------------------------
@@ -45,83 +108,39 @@ async def process_message(
     4. Call the default LLM adapter.
     5. Persist the assistant message.
     6. Return a ``ChatResponse``.
-    """
-    # 1. Get or create conversation ----------------------------------------
-    conversation = await _get_or_create_conversation(
-        session, user_id, conversation_id, message, locale
-    )
-
-    # 2. Save the user message ---------------------------------------------
-    user_msg = Message(
-        conversation_id=conversation.id,
-        role=MessageRole.user,
-        content=message,
-    )
-    session.add(user_msg)
-    await session.flush()
-
-    # 3. RAG: retrieve relevant knowledge and video suggestions -------------
-    rag_chunks = await rag_service.search_knowledge(session, query=message, top_k=3)
-    video_suggestions = await video_service.search_videos(session, query=message, limit=2)
-
-    # Build augmented system prompt with RAG context
-    system_prompt = t("chat_system_prompt", locale)
-    if rag_chunks:
-        context_parts = []
-        for chunk in rag_chunks:
-            context_parts.append(
-                f"[{chunk['title']}]\n{chunk['content']}"
-            )
-        system_prompt += t("rag_context_header", locale) + "\n\n".join(context_parts)
-
-    # 4. Build the LLM request ---------------------------------------------
-    history = await _get_conversation_history(session, conversation.id)
-    llm_messages = [
-        {"role": msg.role.value, "content": msg.content} for msg in history
-    ]
-
-    adapter = llm_registry.get_default()
-
-    # Resolve model name based on provider
-    if adapter.provider_name == "anthropic":
-        model = settings.anthropic_model
-    elif adapter.provider_name == "openai":
-        model = settings.openai_model
-    elif adapter.provider_name == "ollama":
-        model = settings.ollama_model
-    else:
-        model = settings.anthropic_model
 
-    llm_request = LLMRequest(
-        messages=llm_messages,
-        model=model,
-        system_prompt=system_prompt,
-        temperature=0.7,
-        max_tokens=2048,
+    Raises ``LLMQueueFullError`` (and persists nothing) when the provider's
+    admission queue is saturated.
+    """
+    turn = await _prepare_turn(
+        session, user_id, message, conversation_id, llm_registry, locale
     )
 
-    # 5. Call the LLM -------------------------------------------------------
+    # 5. Call the LLM (or reuse a cached answer) ----------------------------
     try:
-        llm_response = await adapter.complete(llm_request)
+        llm_response = await _complete(turn)
+    except LLMQueueFullError:
+        raise
     except Exception:
         logger.exception("LLM completion failed")
         fallback_text = t("chat_fallback", locale)
         assistant_msg = Message(
-            conversation_id=conversation.id,
+            conversation_id=turn.conversation_id,
             role=MessageRole.assistant,
             content=fallback_text,
         )
         session.add(assistant_msg)
         await session.commit()
+        _buffer_turn(turn, assistant_msg)
         return ChatResponse(
             message=fallback_text,
-            conversation_id=conversation.id,
+            conversation_id=turn.conversation_id,
             has_steps=False,
         )
 
     # 6. Save the assistant message -----------------------------------------
     assistant_msg = Message(
-        conversation_id=conversation.id,
+        conversation_id=turn.conversation_id,
         role=MessageRole.assistant,
         content=llm_response.content,
         model_provider=llm_response.model_provider,
@@ -129,31 +148,548 @@ async def process_message(
     )
     session.add(assistant_msg)
     await session.commit()
+    _buffer_turn(turn, assistant_msg)
 
     # 7. Build and return the response --------------------------------------
-    step_pattern = re.compile(STEP_PATTERNS.get(locale, STEP_PATTERNS["pt-BR"]), re.IGNORECASE)
-    has_steps = bool(step_pattern.search(llm_response.content))
+    return _build_response(turn, llm_response.content)
+
+
+async def stream_message(
+    session: AsyncSession,
+    user_id: str,
+    message: str,
+    conversation_id: str | None,
+    llm_registry: LLMRegistry,
+    locale: str = "pt-BR",
+) -> AsyncIterator[str]:
+    """Prepare a user turn and return an iterator of Server-Sent Events.
+
+    The conversation and user message are committed on *session* before
+    this coroutine returns, so the request-scoped session is no longer
+    needed once streaming starts.  Raises ``LLMQueueFullError`` before
+    committing anything when the provider's admission queue is saturated.  The returned iterator emits one
+    ``token`` event per text delta and a final ``done`` event carrying
+    the full ``ChatResponse``.  The assistant message is persisted on a
+    fresh session when the stream finishes -- or with whatever text was
+    produced so far if the client disconnects mid-stream.
+    """
+    turn = await _prepare_turn(
+        session,
+        user_id,
+        message,
+        conversation_id,
+        llm_registry,
+        locale,
+        streaming=True,
+    )
+
+    # Admission happens before anything is committed or streamed, so a
+    # saturated queue surfaces as a plain error response.
+    cached = answer_cache.get(turn.cache_key) if turn.cache_key else None
+    stream = (
+        None
+        if cached
+        else await llm_registry.stream(
+            turn.llm_request, user_id, model_for=_resolve_model
+        )
+    )
+
+    try:
+        await session.commit()
+    except BaseException:
+        if stream is not None:
+            await stream.aclose()
+        raise
+    history_buffer.append(
+        turn.conversation_id,
+        MessageRole.user.value,
+        turn.user_message,
+        turn.user_message_id,
+    )
+    return _stream_turn(turn, cached, stream)
+
+
+# ---------------------------------------------------------------------------
+# Internal helpers
+# ---------------------------------------------------------------------------
+
+
+async def _prepare_turn(
+    session: AsyncSession,
+    user_id: str,
+    message: str,
+    conversation_id: str | None,
+    llm_registry: LLMRegistry,
+    locale: str,
+    streaming: bool = False,
+) -> _PreparedTurn:
+    """Persist the user message and assemble the LLM request for this turn.
+
+    The pre-LLM lookups (knowledge search, video suggestions and history)
+    are independent of each other, so they run concurrently -- each on its
+    own session -- while the user message is written on *session*.  The
+    critical path is therefore the slowest lookup, not their sum.  The
+    request targets the provider :meth:`LLMRegistry.route` prefers for
+    *streaming* or plain completions.
+    """
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+
+    # 1. Kick off the read-only lookups on their own sessions ---------------
+    rag_task = asyncio.create_task(
+        _timed(
+            "rag",
+            timings,
+            _run_with_session(rag_service.search_knowledge, query=message, top_k=3),
+        )
+    )
+    video_task = asyncio.create_task(
+        _timed(
+            "videos",
+            timings,
+            _run_with_session(video_service.search_videos, query=message, limit=2),
+        )
+    )
+    history_task = asyncio.create_task(
+        _timed(
+            "history",
+            timings,
+            _run_with_session(_get_recent_history, conversation_id=conversation_id),
+        )
+        if conversation_id
+        else _no_history()
+    )
+
+    try:
+        # 2. Get or create conversation and save the user message ----------
+        conversation = await _timed(
+            "conversation",
+            timings,
+            _get_or_create_conversation(
+                session, user_id, conversation_id, message, locale
+            ),
+        )
+        user_msg = Message(
+            conversation_id=conversation.id,
+            role=MessageRole.user,
+            content=message,
+        )
+        session.add(user_msg)
+        await session.flush()
+
+        rag_chunks, video_suggestions, recent = await asyncio.gather(
+            rag_task, video_task, history_task
+        )
+    except BaseException:
+        for task in (rag_task, video_task, history_task):
+            task.cancel()
+        raise
+
+    timings["total"] = time.perf_counter() - started
+    logger.info(
+        "Chat pre-LLM timings (ms): %s",
+        ", ".join(f"{stage}={secs * 1000:.1f}" for stage, secs in timings.items()),
+    )
+
+    # 3. Assemble the prompt -----------------------------------------------
+    # History was read on another connection (or from the buffer), so it
+    # cannot see the uncommitted user message -- the context builder appends
+    # it.  A conversation that was requested but not found starts over with
+    # an empty history.  Only seed the buffer once ownership is confirmed.
+    if conversation.id != conversation_id:
+        recent = _RecentHistory([], None, buffered=False)
+    history = recent.turns
+    if not recent.buffered:
+        history_buffer.seed(conversation.id, history, recent.newest_message_id)
+
+    # Weak hits are dropped, neighbouring chunks merged, and the rest cut
+    # to the knowledge-context budget before the overall fit below
+    rag_chunks = select_rag_context(
+        rag_chunks,
+        message,
+        token_budget=settings.rag_context_token_budget,
+        min_relative_score=settings.rag_min_relative_score,
+        snippet_words=settings.rag_snippet_words,
+    )
+    context = build_context(
+        base_system_prompt=t("chat_system_prompt", locale),
+        rag_chunks=rag_chunks,
+        summary=conversation.summary,
+        history=history,
+        user_message=message,
+        token_budget=settings.chat_context_token_budget,
+        locale=locale,
+    )
+
+    # 4. Build the LLM request ---------------------------------------------
+    adapter = llm_registry.route(streaming)[0]
+
+    llm_request = LLMRequest(
+        messages=context.messages,
+        model=_resolve_model(adapter.provider_name),
+        system_prompt=context.system_prompt,
+        system_segments=context.system_segments,
+        cached_messages=context.cached_messages,
+        temperature=0.7,
+        max_tokens=2048,
+    )
+
+    # With no history or summary in the prompt, the answer depends only on
+    # the question, the chunks, the locale and the model -- cacheable.
+    cache_key = None
+    if len(context.messages) == 1 and not conversation.summary:
+        cache_key = make_key(
+            message,
+            (
+                chunk_id
+                for chunk in context.rag_chunks
+                for chunk_id in chunk["chunk_ids"]
+            ),
+            locale,
+            adapter.provider_name,
+            llm_request.model,
+        )
+
+    # Older turns that were dropped -- or that may lie beyond the history
+    # window -- get folded into the running summary once this turn commits.
+    needs_summary = settings.chat_summary_enabled and (
+        context.dropped_turns > 0 or len(history) >= _MAX_HISTORY_MESSAGES
+    )
+
+    return _PreparedTurn(
+        conversation_id=conversation.id,
+        user_id=user_id,
+        user_message=message,
+        user_message_id=user_msg.id,
+        llm_registry=llm_registry,
+        llm_request=llm_request,
+        rag_chunks=context.rag_chunks,
+        video_suggestions=video_suggestions,
+        locale=locale,
+        kept_turns=len(context.messages) - 1,
+        needs_summary=needs_summary,
+        cache_key=cache_key,
+    )
+
+
+async def _timed(stage: str, timings: dict[str, float], coro: Awaitable[_T]) -> _T:
+    """Await *coro* and record its wall-clock duration under *stage*."""
+    started = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[stage] = time.perf_counter() - started
+
+
+async def _run_with_session(func: Callable[..., Awaitable[_T]], **kwargs: Any) -> _T:
+    """Call ``func(session, **kwargs)`` on a short-lived session of its own."""
+    async with AsyncSessionLocal() as session:
+        return await func(session, **kwargs)
+
+
+async def _no_history() -> _RecentHistory:
+    """History placeholder for new conversations."""
+    return _RecentHistory([], None, buffered=False)
+
+
+def _buffer_turn(turn: _PreparedTurn, assistant_msg: Message) -> None:
+    """Write a committed user/assistant exchange through to the buffer."""
+    history_buffer.append(
+        turn.conversation_id,
+        MessageRole.user.value,
+        turn.user_message,
+        turn.user_message_id,
+    )
+    history_buffer.append(
+        turn.conversation_id,
+        MessageRole.assistant.value,
+        assistant_msg.content,
+        assistant_msg.id,
+    )
+    _schedule_summary(turn)
+
+
+def _resolve_model(provider: str) -> str:
+    """Return the configured chat model for *provider*."""
+    if provider == "anthropic":
+        return settings.anthropic_model
+    if provider == "openai":
+        return settings.openai_model
+    if provider == "ollama":
+        return settings.ollama_model
+    return settings.anthropic_model
+
+
+def _schedule_summary(turn: _PreparedTurn) -> None:
+    """Fold older turns into the conversation summary in the background."""
+    if not turn.needs_summary or turn.conversation_id in _summaries_in_flight:
+        return
+    _summaries_in_flight.add(turn.conversation_id)
+    # Keep the turns that were sent this time plus the new user/assistant pair
+    task = asyncio.create_task(
+        _update_summary(
+            turn.conversation_id,
+            turn.kept_turns + 2,
+            turn.llm_registry,
+            turn.locale,
+        )
+    )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _update_summary(
+    conversation_id: str,
+    keep: int,
+    llm_registry: LLMRegistry,
+    locale: str,
+) -> None:
+    """Fold unsummarized messages older than the newest *keep* into
+    ``Conversation.summary``.
+
+    Only messages after ``summarized_through`` are read, so each pass costs
+    one small LLM call over the newly evicted turns rather than a
+    re-summarization of the whole conversation.  Passes with fewer than
+    ``_SUMMARY_MIN_MESSAGES`` such messages return without calling the LLM.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            conversation = await session.get(Conversation, conversation_id)
+            if conversation is None:
+                return
+
+            # created_at of the oldest message we want to keep verbatim
+            boundary = (
+                select(Message.created_at)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at.desc())
+                .offset(keep - 1)
+                .limit(1)
+                .scalar_subquery()
+            )
+            query = select(Message.role, Message.content, Message.created_at).where(
+                Message.conversation_id == conversation_id,
+                Message.created_at < boundary,
+            )
+            if conversation.summarized_through is not None:
+                query = query.where(Message.created_at > conversation.summarized_through)
+            result = await session.execute(
+                query.order_by(Message.created_at.asc()).limit(_SUMMARY_BATCH_MESSAGES)
+            )
+            rows = result.all()
+            if len(rows) < _SUMMARY_MIN_MESSAGES:
+                return
+
+            transcript = "\n".join(f"{role.value}: {content}" for role, content, _ in rows)
+            summary_request = LLMRequest(
+                messages=[
+                    {
+                        "role": "user",
+                        "content": t("summary_request", locale).format(
+                            summary=conversation.summary or "-",
+                            transcript=transcript,
+                        ),
+                    }
+                ],
+                model=_resolve_model(llm_registry.get_default().provider_name),
+                system_prompt=t("summary_system_prompt", locale),
+                temperature=0.3,
+                max_tokens=settings.chat_summary_max_tokens,
+            )
+            # Background work queues fairly alongside users under its own ID
+            llm_response = await llm_registry.complete(
+                summary_request, _SUMMARY_SCHEDULER_ID, model_for=_resolve_model
+            )
+            summary = llm_response.content.strip()
+            if not summary:
+                return
+
+            conversation.summary = summary
+            conversation.summarized_through = rows[-1][2]
+            await session.commit()
+
+            # Drop the folded turns from the in-memory buffer as well
+            result = await session.execute(
+                select(func.count())
+                .select_from(Message)
+                .where(
+                    Message.conversation_id == conversation_id,
+                    Message.created_at > conversation.summarized_through,
+                )
+            )
+            history_buffer.truncate(conversation_id, result.scalar_one())
+            logger.info(
+                "Folded %d messages into summary of conversation %s",
+                len(rows),
+                conversation_id,
+            )
+    except Exception:
+        logger.exception("Failed to update summary for conversation %s", conversation_id)
+    finally:
+        _summaries_in_flight.discard(conversation_id)
+
+
+async def _complete(turn: _PreparedTurn) -> LLMResponse:
+    """Run a routed completion unless a cached answer can be reused."""
+    if turn.cache_key is not None:
+        cached = answer_cache.get(turn.cache_key)
+        if cached is not None:
+            return LLMResponse(
+                content=cached.content,
+                model_provider=cached.model_provider,
+                model_name=cached.model_name,
+            )
+
+    llm_response = await turn.llm_registry.complete(
+        turn.llm_request, turn.user_id, model_for=_resolve_model
+    )
+    logger.debug(
+        "LLM usage: input=%d output=%d cache_read=%d cache_write=%d",
+        llm_response.tokens_input,
+        llm_response.tokens_output,
+        llm_response.tokens_cache_read,
+        llm_response.tokens_cache_write,
+    )
+
+    _cache_answer(
+        turn,
+        llm_response.content,
+        llm_response.model_provider,
+        llm_response.model_name,
+    )
+    return llm_response
+
+
+def _cache_answer(
+    turn: _PreparedTurn, content: str, provider: str, model: str
+) -> None:
+    """Cache a history-independent answer under the model that wrote it.
+
+    After a failover that is not the model the turn was prepared for, so
+    the answer is only reused by turns routed to the same model.
+    """
+    if turn.cache_key is None or not content:
+        return
+    answer_cache.put(
+        rekey(turn.cache_key, provider, model),
+        CachedAnswer(content=content, model_provider=provider, model_name=model),
+    )
+
+
+def _build_response(turn: _PreparedTurn, content: str) -> ChatResponse:
+    """Wrap the assistant *content* with step detection, video and sources."""
+    step_pattern = re.compile(
+        STEP_PATTERNS.get(turn.locale, STEP_PATTERNS["pt-BR"]), re.IGNORECASE
+    )
+    has_steps = bool(step_pattern.search(content))
 
     # Include first matching video as suggestion, and RAG sources
-    suggested_video = video_suggestions[0] if video_suggestions else None
+    suggested_video = turn.video_suggestions[0] if turn.video_suggestions else None
     sources = (
-        [{"title": c["title"], "source": c["source"]} for c in rag_chunks]
-        if rag_chunks
+        [{"title": c["title"], "source": c["source"]} for c in turn.rag_chunks]
+        if turn.rag_chunks
         else None
     )
 
     return ChatResponse(
-        message=llm_response.content,
-        conversation_id=conversation.id,
+        message=content,
+        conversation_id=turn.conversation_id,
         has_steps=has_steps,
         suggested_video=suggested_video,
         sources=sources,
     )
 
 
-# ---------------------------------------------------------------------------
-# Internal helpers
-# ---------------------------------------------------------------------------
+def _sse_event(event: str, data: dict) -> str:
+    """Format a single Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_turn(
+    turn: _PreparedTurn,
+    cached: CachedAnswer | None,
+    stream: RoutedStream | None,
+) -> AsyncIterator[str]:
+    """Relay adapter text deltas as SSE frames and persist the final answer.
+
+    *stream* holds the admission slot for the upstream call; it is closed
+    -- releasing the slot -- as soon as the upstream call ends.  The answer
+    is stored under the provider and model that actually served it.
+    """
+    parts: list[str] = []
+    used_fallback = False
+    try:
+        try:
+            if cached is not None:
+                parts.append(cached.content)
+                yield _sse_event("token", {"text": cached.content})
+            elif stream is not None:
+                try:
+                    async for delta in stream:
+                        parts.append(delta)
+                        yield _sse_event("token", {"text": delta})
+                finally:
+                    await stream.aclose()
+                _cache_answer(turn, "".join(parts), stream.provider, stream.model)
+        except Exception:
+            logger.exception("LLM streaming failed")
+            if not parts:
+                # Nothing reached the user yet -- degrade to the fallback text
+                used_fallback = True
+                fallback_text = t("chat_fallback", turn.locale)
+                parts.append(fallback_text)
+                yield _sse_event("token", {"text": fallback_text})
+
+        content = "".join(parts)
+        response = _build_response(turn, content)
+        yield _sse_event("done", response.model_dump())
+    finally:
+        # Runs on normal completion and when the client disconnects
+        # (GeneratorExit / cancellation); shield the write so it completes.
+        if parts:
+            provider = model = None
+            if cached is not None:
+                provider, model = cached.model_provider, cached.model_name
+            elif stream is not None and not used_fallback:
+                provider, model = stream.provider, stream.model
+            await asyncio.shield(
+                _save_assistant_message(turn, "".join(parts), provider, model)
+            )
+
+
+async def _save_assistant_message(
+    turn: _PreparedTurn,
+    content: str,
+    provider: str | None,
+    model: str | None,
+) -> None:
+    """Persist the streamed assistant message on its own session.
+
+    *provider* and *model* are ``None`` for the fallback text.
+    """
+    assistant_msg = Message(
+        conversation_id=turn.conversation_id,
+        role=MessageRole.assistant,
+        content=content,
+        model_provider=provider,
+        model_name=model,
+    )
+    try:
+        async with AsyncSessionLocal() as session:
+            session.add(assistant_msg)
+            await session.commit()
+        history_buffer.append(
+            turn.conversation_id,
+            MessageRole.assistant.value,
+            content,
+            assistant_msg.id,
+        )
+        _schedule_summary(turn)
+    except Exception:
+        logger.exception(
+            "Failed to save streamed assistant message for conversation %s",
+            turn.conversation_id,
+        )
 
 
 async def _get_or_create_conversation(
@@ -187,19 +723,55 @@ async def _get_or_create_conversation(
     return conversation
 
 
-async def _get_conversation_history(
+async def _get_recent_history(
     session: AsyncSession,
     conversation_id: str,
-) -> list[Message]:
-    """Load the last N messages for context."""
-    result = await session.execute(
-        select(Message)
+) -> _RecentHistory:
+    """Return the recent history, from the buffer while it is current.
+
+    The id of the conversation's newest committed message is one index
+    seek; the buffered turns are used only if they end with that message,
+    so turns committed by another worker force a reload from the database.
+    """
+    newest_message_id = await session.scalar(
+        select(Message.id)
         .where(Message.conversation_id == conversation_id)
-        .order_by(Message.created_at.asc())
+        .order_by(Message.created_at.desc())
+        .limit(1)
     )
-    messages = list(result.scalars().all())
+    buffered = history_buffer.get(conversation_id, newest_message_id)
+    if buffered is not None:
+        return _RecentHistory(buffered, newest_message_id, buffered=True)
+    turns = await _get_conversation_history(session, conversation_id)
+    return _RecentHistory(turns, newest_message_id, buffered=False)
+
 
-    if len(messages) > _MAX_HISTORY_MESSAGES:
-        messages = messages[-_MAX_HISTORY_MESSAGES:]
+async def _get_conversation_history(
+    session: AsyncSession,
+    conversation_id: str,
+) -> list[HistoryTurn]:
+    """Load the last N ``(role, content)`` pairs for context, oldest first.
 
-    return messages
+    Only the two needed columns are selected and the database applies the
+    limit, so long conversations cost the same as short ones.  Messages
+    already folded into the conversation summary are skipped.
+    """
+    summarized_through = (
+        select(Conversation.summarized_through)
+        .where(Conversation.id == conversation_id)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        select(Message.role, Message.content)
+        .where(
+            Message.conversation_id == conversation_id,
+            or_(
+                summarized_through.is_(None),
+                Message.created_at > summarized_through,
+            ),
+        )
+        .order_by(Message.created_at.desc())
+        .limit(_MAX_HISTORY_MESSAGES)
+    )
+    rows = result.all()
+    return [(role.value, content) for role, content in reversed(rows)]
@@ -0,0 +1,125 @@
+"""Token-budgeted LLM context assembly for chat turns.
+
+Fits the system prompt, knowledge-base context, running conversation
+summary and recent history into a fixed input-token budget.  Token counts
+come from a cheap local estimate, so no provider tokenizer is needed.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+from app.adapters.llm.base_llm import PromptSegment
+from app.i18n import t
+from app.services.history_buffer import HistoryTurn
+
+# Average characters per token for pt-BR / en text on current BPE tokenizers.
+# Deliberately a little low so the estimate errs on the side of overcounting.
+_CHARS_PER_TOKEN = 3.5
+
+# Fixed per-message overhead (role markers, separators) added by providers
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@dataclass
+class BuiltContext:
+    """Result of fitting one chat turn into the token budget."""
+
+    system_prompt: str
+    system_segments: list[PromptSegment]
+    messages: list[dict]
+    cached_messages: int  # leading messages repeated from the previous turn
+    rag_chunks: list[dict]  # the chunks that actually made it into the prompt
+    dropped_turns: int  # history turns left out for lack of budget
+    estimated_tokens: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Return a rough, provider-independent token count for *text*."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+def build_context(
+    base_system_prompt: str,
+    rag_chunks: list[dict],
+    summary: str | None,
+    history: list[HistoryTurn],
+    user_message: str,
+    token_budget: int,
+    locale: str = "pt-BR",
+) -> BuiltContext:
+    """Assemble the system prompt and message list within *token_budget*.
+
+    Priority order: the base system prompt, the current user message and
+    the conversation summary are always included; knowledge-base chunks
+    are added in rank order while they fit; the remaining budget goes to
+    history, newest turns first.  History never starts with an assistant
+    turn, since some providers reject that.
+
+    The prompt is laid out so that what repeats from turn to turn comes
+    first: the system prompt (base prompt, then the summary, which only
+    changes every few turns) and the history form a prefix that providers
+    with prompt caching can reuse, and ``cached_messages`` marks where it
+    ends.  The knowledge context differs with every question, so it goes
+    into the final user message rather than ahead of the history.
+    """
+    used = (
+        estimate_tokens(base_system_prompt)
+        + estimate_tokens(user_message)
+        + _MESSAGE_OVERHEAD_TOKENS
+    )
+
+    summary_block = ""
+    if summary:
+        summary_block = t("conversation_summary_header", locale) + summary
+        used += estimate_tokens(summary_block)
+
+    # Knowledge-base context, best match first ------------------------------
+    included_chunks: list[dict] = []
+    context_parts: list[str] = []
+    header = t("rag_context_header", locale)
+    header_tokens = estimate_tokens(header)
+    for chunk in rag_chunks:
+        part = f"[{chunk['title']}]\n{chunk['content']}"
+        cost = estimate_tokens(part) + (0 if context_parts else header_tokens)
+        if used + cost > token_budget:
+            break
+        context_parts.append(part)
+        included_chunks.append(chunk)
+        used += cost
+    segments = [PromptSegment(base_system_prompt, cacheable=True)]
+    if summary_block:
+        segments.append(PromptSegment(summary_block, cacheable=True))
+
+    # History, newest first -------------------------------------------------
+    kept = 0
+    for role, content in reversed(history):
+        cost = estimate_tokens(content) + _MESSAGE_OVERHEAD_TOKENS
+        if used + cost > token_budget:
+            break
+        used += cost
+        kept += 1
+    kept_history = history[len(history) - kept:] if kept else []
+    while kept_history and kept_history[0][0] != "user":
+        used -= estimate_tokens(kept_history[0][1]) + _MESSAGE_OVERHEAD_TOKENS
+        kept_history = kept_history[1:]
+
+    messages = [{"role": role, "content": content} for role, content in kept_history]
+    question = user_message
+    if context_parts:
+        knowledge = header.strip() + "\n\n" + "\n\n".join(context_parts)
+        question = f"{knowledge}\n\n---\n\n{user_message}"
+    messages.append({"role": "user", "content": question})
+
+    return BuiltContext(
+        system_prompt="".join(segment.text for segment in segments),
+        system_segments=segments,
+        messages=messages,
+        cached_messages=len(kept_history),
+        rag_chunks=included_chunks,
+        dropped_turns=len(history) - len(kept_history),
+        estimated_tokens=used,
+    )
@@ -0,0 +1,203 @@
+"""Optional in-memory dense vector index for hybrid knowledge retrieval.
+
+Keyword search misses paraphrases ("marcar consulta" vs. "agendar
+atendimento"), which are common in spoken questions.  This module keeps
+a dense index next to FTS5, using a fully offline embedding: hashed
+TF-IDF over stemmed words and character trigrams (see
+:func:`app.services.embedding.embed_text`).  It needs no model download and no network access.
+
+Each chunk's raw hashed term-frequency vector is stored on its
+``knowledge_chunks.embedding`` row as a little-endian float32 BLOB.  On
+load, all vectors are read into one contiguous NumPy matrix, weighted
+by IDF and L2-normalised, so a query is a single matrix-vector product
+followed by an ``argpartition`` top-k.
+
+NumPy is an optional dependency (``pip install .[dense]``).  Without it,
+or with ``RAG_DENSE_ENABLED`` off, :attr:`DenseIndex.ready` stays
+``False`` and search is FTS-only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.knowledge_chunk import KnowledgeChunk
+from app.services.embedding import (
+    chunk_embedding_text,
+    embed_text,
+    embedding_blob,
+    numpy_available,
+)
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+logger = logging.getLogger(__name__)
+
+# Above this many rows, run the matrix product in a worker thread
+_THREAD_OFFLOAD_ROWS = 20_000
+
+
+def _embed_rows(
+    rows: list[tuple[str, str, str, str | None]], dim: int
+) -> dict[str, bytes]:
+    """Embed ``(id, title, content, keywords)`` rows; return ``{id: BLOB}``."""
+    return {
+        chunk_id: embedding_blob(chunk_embedding_text(title, content, keywords), dim)
+        for chunk_id, title, content, keywords in rows
+    }
+
+
+class DenseIndex:
+    """Contiguous float32 matrix of chunk vectors with IDF-weighted cosine search."""
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        # (chunk ids, normalised IDF-weighted matrix, idf) -- swapped as one
+        self._state: tuple[list[str], npt.NDArray, npt.NDArray] | None = None
+
+    @property
+    def ready(self) -> bool:
+        """``True`` once vectors are loaded and search can be used."""
+        return self._state is not None
+
+    @property
+    def size(self) -> int:
+        return len(self._state[0]) if self._state is not None else 0
+
+    def clear(self) -> None:
+        self._state = None
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self, ids: list[str], raw: npt.NDArray) -> None:
+        """Install *raw* (rows of hashed TF vectors, one per id).
+
+        *raw* is modified in place to save memory on large corpora.
+        """
+        rows = raw.shape[0]
+        document_frequency = np.count_nonzero(raw, axis=0)
+        idf = (np.log((rows + 1) / (document_frequency + 1)) + 1.0).astype(np.float32)
+        raw *= idf
+        norms = np.linalg.norm(raw, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        raw /= norms
+        self._state = (list(ids), raw, idf)
+
+    async def load(self, session: AsyncSession) -> None:
+        """Load all chunk vectors, embedding and storing any that are missing.
+
+        Rows without an embedding (indexed before dense retrieval was
+        enabled) or with one of a different dimension are backfilled with
+        a single ``executemany``.  Only those rows' text is read, and the
+        embedding and matrix building run in a worker thread, so a large
+        backfill does not block the event loop.
+        """
+        if np is None:
+            return
+
+        expected_bytes = self.dim * 4
+        result = await session.execute(
+            select(KnowledgeChunk.id, KnowledgeChunk.embedding)
+        )
+        rows = result.all()
+        missing = sum(
+            1 for _, blob in rows if blob is None or len(blob) != expected_bytes
+        )
+
+        backfill: dict[str, bytes] = {}
+        if missing:
+            result = await session.execute(
+                select(
+                    KnowledgeChunk.id,
+                    KnowledgeChunk.title,
+                    KnowledgeChunk.content,
+                    KnowledgeChunk.keywords,
+                ).where(
+                    or_(
+                        KnowledgeChunk.embedding.is_(None),
+                        func.length(KnowledgeChunk.embedding) != expected_bytes,
+                    )
+                )
+            )
+            backfill = await asyncio.to_thread(_embed_rows, result.all(), self.dim)
+            # Core executemany: no per-row ORM bookkeeping on the event loop
+            table = KnowledgeChunk.__table__
+            await session.execute(
+                update(table)
+                .where(table.c.id == bindparam("chunk_id"))
+                .values(embedding=bindparam("blob")),
+                [
+                    {"chunk_id": chunk_id, "blob": blob}
+                    for chunk_id, blob in backfill.items()
+                ],
+            )
+            await session.commit()
+
+        ids = [chunk_id for chunk_id, _ in rows]
+        if not ids:
+            self._state = None
+            return
+        blobs = [backfill.get(chunk_id) or blob for chunk_id, blob in rows]
+        await asyncio.to_thread(self._build_from_blobs, ids, blobs)
+        logger.info(
+            "Dense index loaded: %d chunks x %d dims (%d backfilled)",
+            len(ids),
+            self.dim,
+            len(backfill),
+        )
+
+    def _build_from_blobs(self, ids: list[str], blobs: list[bytes]) -> None:
+        """:meth:`build` from stored BLOBs, via one contiguous, writable matrix."""
+        raw = np.frombuffer(b"".join(blobs), dtype="<f4").reshape(len(ids), self.dim)
+        self.build(ids, raw.astype(np.float32, copy=True))
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, k: int) -> list[tuple[str, float]]:
+        """Return up to *k* ``(chunk_id, cosine)`` pairs, best first."""
+        state = self._state
+        if state is None or k <= 0:
+            return []
+        ids, matrix, idf = state
+
+        vector = embed_text(query, self.dim) * idf
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return []
+        scores = matrix @ (vector / norm)
+
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    async def asearch(self, query: str, k: int) -> list[tuple[str, float]]:
+        """:meth:`search`, offloaded to a thread for large matrices."""
+        if self.size > _THREAD_OFFLOAD_ROWS:
+            return await asyncio.to_thread(self.search, query, k)
+        return self.search(query, k)
+
+
+def dense_enabled() -> bool:
+    """Return ``True`` if hybrid retrieval is configured and possible."""
+    return settings.rag_dense_enabled and np is not None
+
+
+# Module-level singleton
+dense_index = DenseIndex(settings.rag_dense_dim)
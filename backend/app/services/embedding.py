@@ -0,0 +1,71 @@
+"""Offline hashed-TF embedding of text for the dense knowledge index.
+
+Stems plus their character trigrams are feature-hashed into a fixed
+number of dimensions.  This module depends only on the standard library,
+:mod:`app.services.search_text` and (optionally) NumPy, so knowledge-base
+parser workers can embed chunks without loading settings or the ORM.
+"""
+
+from __future__ import annotations
+
+import math
+import zlib
+from typing import TYPE_CHECKING
+
+from app.services.search_text import STOPWORDS, stem, tokenize
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+# Weight of character trigrams relative to whole (stemmed) words
+_TRIGRAM_WEIGHT = 0.5
+
+
+def numpy_available() -> bool:
+    """Return ``True`` if the optional NumPy dependency is installed."""
+    return np is not None
+
+
+def _features(text: str) -> dict[str, float]:
+    """Return weighted hashing features: stems plus their char trigrams."""
+    features: dict[str, float] = {}
+    for token in tokenize(text):
+        if token in STOPWORDS:
+            continue
+        word = stem(token)
+        features[word] = features.get(word, 0.0) + 1.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            gram = "3:" + padded[i : i + 3]
+            features[gram] = features.get(gram, 0.0) + _TRIGRAM_WEIGHT
+    return features
+
+
+def embed_text(text: str, dim: int) -> npt.NDArray:
+    """Return the sublinear, L2-normalised hashed TF vector of *text*.
+
+    Feature hashing uses CRC32, which is stable across processes (unlike
+    ``hash()``), so stored vectors stay valid between restarts.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, count in _features(text).items():
+        vector[zlib.crc32(feature.encode("utf-8")) % dim] += 1.0 + math.log(count)
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def embedding_blob(text: str, dim: int) -> bytes:
+    """Return the stored (float32 little-endian) embedding of *text*."""
+    return embed_text(text, dim).astype("<f4").tobytes()
+
+
+def chunk_embedding_text(title: str, content: str, keywords: str | None) -> str:
+    """Return the text embedded for one knowledge chunk."""
+    return f"{title}\n{keywords or ''}\n{content}"
@@ -0,0 +1,109 @@
+"""In-memory rolling history buffer for active conversations.
+
+Keeps the last few ``(role, content)`` turns of recently used conversations
+so that most chat turns can build their LLM context without the history
+query.  The buffer is write-through: callers append every message they
+commit, and a conversation is only served from memory once it has been
+seeded from the database (or created in this process).
+
+Each entry remembers the id of the newest message it has seen.  The buffer
+is per-process, so when running several workers a conversation may get
+turns committed elsewhere; callers therefore pass the id of the newest
+committed message (a single index seek) to :meth:`get`, and an entry that
+does not match it is treated as a miss and re-seeded from the database.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from app.config import settings
+
+HistoryTurn = tuple[str, str]  # (role, content)
+
+
+@dataclass
+class _BufferedConversation:
+    turns: deque[HistoryTurn]
+    newest_message_id: str | None  # last committed message seen
+
+
+class ConversationHistoryBuffer:
+    """LRU of per-conversation ring buffers holding the most recent turns."""
+
+    def __init__(self, max_conversations: int, max_messages: int) -> None:
+        self._max_conversations = max_conversations
+        self._max_messages = max_messages
+        self._buffers: OrderedDict[str, _BufferedConversation] = OrderedDict()
+
+    def get(
+        self, conversation_id: str, newest_message_id: str | None
+    ) -> list[HistoryTurn] | None:
+        """Return the buffered turns, or ``None`` if the conversation is not
+        buffered or the buffer has not seen *newest_message_id* -- the id of
+        the conversation's newest committed message -- as its last message."""
+        buffer = self._buffers.get(conversation_id)
+        if buffer is None:
+            return None
+        if buffer.newest_message_id != newest_message_id:
+            # Another worker committed turns this buffer never saw
+            del self._buffers[conversation_id]
+            return None
+        self._buffers.move_to_end(conversation_id)
+        return list(buffer.turns)
+
+    def seed(
+        self,
+        conversation_id: str,
+        turns: list[HistoryTurn],
+        newest_message_id: str | None,
+    ) -> None:
+        """Start buffering *conversation_id* with its known recent *turns*,
+        the last of which is the message *newest_message_id*."""
+        if self._max_conversations <= 0:
+            return
+        self._buffers[conversation_id] = _BufferedConversation(
+            deque(turns, maxlen=self._max_messages), newest_message_id
+        )
+        self._buffers.move_to_end(conversation_id)
+        while len(self._buffers) > self._max_conversations:
+            self._buffers.popitem(last=False)
+
+    def append(
+        self, conversation_id: str, role: str, content: str, message_id: str
+    ) -> None:
+        """Record a committed message; ignored for unbuffered conversations."""
+        buffer = self._buffers.get(conversation_id)
+        if buffer is not None:
+            buffer.turns.append((role, content))
+            buffer.newest_message_id = message_id
+
+    def truncate(self, conversation_id: str, keep_last: int) -> None:
+        """Keep only the newest *keep_last* turns of *conversation_id*."""
+        buffer = self._buffers.get(conversation_id)
+        if buffer is None:
+            return
+        while len(buffer.turns) > max(keep_last, 0):
+            buffer.turns.popleft()
+
+    def discard(self, conversation_id: str) -> None:
+        """Forget *conversation_id* so the next turn reloads it."""
+        self._buffers.pop(conversation_id, None)
+
+    def clear(self) -> None:
+        """Drop every buffered conversation."""
+        self._buffers.clear()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+
+history_buffer = ConversationHistoryBuffer(
+    max_conversations=(
+        settings.chat_history_buffer_size
+        if settings.chat_history_buffer_enabled
+        else 0
+    ),
+    max_messages=settings.chat_history_max_messages,
+)
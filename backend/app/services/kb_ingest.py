@@ -0,0 +1,253 @@
+"""Knowledge-base ingestion: hash, parse and chunk markdown files off the loop.
+
+Parsing front matter and chunking is CPU-bound.  For a handful of files
+it runs in the default thread pool.  For large document sets it runs in
+a process pool, so it scales across cores and never competes with
+request handling for the GIL.  Results are streamed back as each file
+completes, with a bounded number of files in flight, so memory stays
+flat however large the corpus is.
+
+This module is imported by pool workers, so it keeps its imports light
+and must not touch the database: chunk embeddings come from
+:mod:`app.services.embedding`, not the database-backed dense index.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+
+import frontmatter
+
+logger = logging.getLogger(__name__)
+
+# Chunk budget in whitespace-separated words (a cheap proxy for LLM
+# tokens), and the most a chunk may repeat from its predecessor
+_CHUNK_TOKENS = 120
+_CHUNK_OVERLAP_TOKENS = 20
+
+# Bump when chunk_text() output changes, so indexed files are re-chunked
+CHUNKER_VERSION = 2
+
+_BLOCK_SPLIT_RE = re.compile(r"\n[ \t]*\n")
+_HEADING_RE = re.compile(r"^ {0,3}#{1,6}\s+\S")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Below this many files, process start-up costs more than it saves
+_PROCESS_POOL_MIN_FILES = 32
+
+# Parsed files waiting to be written, per worker
+_IN_FLIGHT_PER_WORKER = 2
+
+
+@dataclass
+class ParsedFile:
+    """One markdown file, ready to be written to the index."""
+
+    content_hash: str
+    title: str = ""
+    keywords: str = ""
+    # ``None`` when the content hash matched the previously indexed one
+    chunks: list[str] | None = None
+    embeddings: list[bytes] | None = None
+
+
+def chunk_text(
+    text_body: str,
+    max_tokens: int = _CHUNK_TOKENS,
+    overlap_tokens: int = _CHUNK_OVERLAP_TOKENS,
+) -> list[str]:
+    """Split markdown into chunks of at most about *max_tokens* words.
+
+    A single pass over the blank-line separated blocks.  A heading starts
+    a new chunk and is repeated at the top of every chunk of its section,
+    so "Passo 3" stays next to what it is a step of.  Whole blocks are
+    packed greedily.  A block over the budget is split on sentences, then
+    on words.  A chunk that fills up carries its last block (when it is
+    at most *overlap_tokens* words) into the next one for continuity.
+
+    Every block is consumed exactly once, so the run time is linear in
+    the input.  Every chunk holds new text, so the chunk count is bounded
+    by the input size divided by ``max_tokens - overlap_tokens``, plus
+    the number of sections.
+    """
+    chunks: list[str] = []
+    heading = ""
+    budget = max_tokens
+    parts: list[tuple[str, int]] = []  # (text, words) of the open chunk
+    size = 0
+
+    def emit() -> None:
+        body = "\n\n".join(part for part, _ in parts)
+        chunks.append(f"{heading}\n\n{body}" if heading else body)
+
+    for block in _BLOCK_SPLIT_RE.split(text_body):
+        block = block.strip()
+        if not block:
+            continue
+        first_line, _, rest = block.partition("\n")
+        if _HEADING_RE.match(first_line):
+            if parts:
+                emit()
+            parts, size = [], 0
+            heading = first_line.strip()
+            budget = max(max_tokens - len(heading.split()), max_tokens // 2)
+            block = rest.strip()
+            if not block:
+                continue
+
+        for piece, words in _block_pieces(block, budget):
+            if parts and size + words > budget:
+                emit()
+                carry = parts[-1]
+                if carry[1] <= overlap_tokens and carry[1] + words <= budget:
+                    parts, size = [carry], carry[1]
+                else:
+                    parts, size = [], 0
+            parts.append((piece, words))
+            size += words
+    if parts:
+        emit()
+    return chunks
+
+
+def _block_pieces(block: str, budget: int) -> list[tuple[str, int]]:
+    """Return *block* as ``(text, words)`` pieces of at most *budget* words."""
+    words = len(block.split())
+    if words <= budget:
+        return [(block, words)]
+
+    pieces: list[tuple[str, int]] = []
+    sentences: list[str] = []
+    size = 0
+    for sentence in _SENTENCE_SPLIT_RE.split(block):
+        sentence_words = sentence.split()
+        if len(sentence_words) > budget:
+            # No usable sentence break: fall back to fixed word windows
+            if sentences:
+                pieces.append((" ".join(sentences), size))
+                sentences, size = [], 0
+            for start in range(0, len(sentence_words), budget):
+                window = sentence_words[start : start + budget]
+                pieces.append((" ".join(window), len(window)))
+            continue
+        if sentences and size + len(sentence_words) > budget:
+            pieces.append((" ".join(sentences), size))
+            sentences, size = [], 0
+        sentences.append(sentence)
+        size += len(sentence_words)
+    if sentences:
+        pieces.append((" ".join(sentences), size))
+    return pieces
+
+
+def parse_file(path: str, known_hash: str | None, dense_dim: int | None) -> ParsedFile:
+    """Hash, parse and chunk one markdown file (runs in a pool worker).
+
+    If the content hash equals *known_hash* the file is not parsed.  When
+    *dense_dim* is set, chunk embeddings are computed here as well.
+    """
+    raw = Path(path).read_bytes()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if content_hash == known_hash:
+        return ParsedFile(content_hash=content_hash)
+
+    post = frontmatter.loads(raw.decode("utf-8"))
+    title = str(post.get("title", Path(path).name))
+    keywords = post.get("keywords", "")
+    if isinstance(keywords, (list, tuple)):
+        keywords = ", ".join(str(keyword) for keyword in keywords)
+    chunks = chunk_text(post.content)
+
+    embeddings = None
+    if dense_dim:
+        from app.services.embedding import chunk_embedding_text, embedding_blob
+
+        embeddings = [
+            embedding_blob(chunk_embedding_text(title, chunk, keywords), dense_dim)
+            for chunk in chunks
+        ]
+    return ParsedFile(
+        content_hash=content_hash,
+        title=title,
+        keywords=keywords,
+        chunks=chunks,
+        embeddings=embeddings,
+    )
+
+
+async def parse_files(
+    jobs: list[tuple[Path, str | None]],
+    workers: int,
+    dense_dim: int | None = None,
+) -> AsyncIterator[tuple[Path, ParsedFile | Exception]]:
+    """Parse ``(path, known_hash)`` jobs concurrently, yielding as they finish.
+
+    A failed file yields its exception instead of a :class:`ParsedFile`.
+    """
+    if not jobs:
+        return
+    workers = max(1, workers or os.cpu_count() or 1)
+    loop = asyncio.get_running_loop()
+
+    executor: Executor | None = None
+    if workers > 1 and len(jobs) >= _PROCESS_POOL_MIN_FILES:
+        # "spawn": forking a process that runs threads (aiosqlite) is unsafe
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    remaining = iter(jobs)
+    retry: list[tuple[Path, str | None]] = []
+    pending: dict[asyncio.Future, tuple[Path, str | None]] = {}
+    try:
+        while True:
+            while len(pending) < workers * _IN_FLIGHT_PER_WORKER:
+                job = retry.pop() if retry else next(remaining, None)
+                if job is None:
+                    break
+                path, known_hash = job
+                try:
+                    future = loop.run_in_executor(
+                        executor, parse_file, str(path), known_hash, dense_dim
+                    )
+                except BrokenProcessPool:
+                    executor = await _abandon_pool(executor)
+                    retry.append(job)
+                    continue
+                pending[future] = job
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                exc = future.exception()
+                if isinstance(exc, BrokenProcessPool):
+                    # A worker died; the file itself may be fine
+                    executor = await _abandon_pool(executor)
+                    retry.append(job)
+                    continue
+                yield job[0], exc if exc is not None else future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+
+async def _abandon_pool(executor: Executor | None) -> None:
+    """Shut down a broken process pool; parsing continues on threads."""
+    if executor is not None:
+        logger.warning("Knowledge-base parser pool broke; falling back to threads")
+        await asyncio.to_thread(executor.shutdown, False, cancel_futures=True)
+    return None
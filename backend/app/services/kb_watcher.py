@@ -0,0 +1,163 @@
+"""Background watcher that re-indexes the knowledge base when files change.
+
+With ``KB_WATCH_ENABLED`` on, edits to ``knowledge_base_dir`` show up
+in search within seconds, without a restart that would also empty every
+warm cache.  Changes are detected with ``watchfiles`` (inotify on Linux,
+installed with ``uvicorn[standard]``), or with a periodic stat scan when
+it is not available.  A burst of edits, such as an editor saving several
+files or a ``git pull``, is debounced into one re-index once the
+directory has been quiet for ``kb_watch_debounce_seconds``.
+
+Re-indexing is the normal incremental
+:func:`rag_service.index_knowledge_base`, so only the changed files are
+read and parsed, off the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services import rag_service
+
+try:
+    import watchfiles
+except ImportError:  # optional dependency
+    watchfiles = None
+
+logger = logging.getLogger(__name__)
+
+# Under continuous churn, re-index at least this often (in debounce periods)
+_MAX_DEBOUNCE_PERIODS = 10
+
+# How long shutdown waits for the watcher before cancelling it
+_STOP_TIMEOUT_SECONDS = 5.0
+
+
+def _is_markdown(path: str) -> bool:
+    return path.endswith(".md")
+
+
+def _scan(directory: Path) -> dict[str, tuple[int, int]]:
+    """Return ``{filename: (mtime_ns, size)}`` for the markdown files."""
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return {}
+    files: dict[str, tuple[int, int]] = {}
+    for entry in entries:
+        if not _is_markdown(entry.name):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:  # removed while scanning
+            continue
+        files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class KnowledgeBaseWatcher:
+    """Watch a directory and re-index the knowledge base after changes."""
+
+    def __init__(
+        self,
+        directory: Path,
+        debounce_seconds: float,
+        poll_seconds: float,
+    ) -> None:
+        self.directory = directory
+        self.debounce_seconds = debounce_seconds
+        self.poll_seconds = poll_seconds
+        self._stop = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start watching in a background task (no-op if already running)."""
+        if self.running:
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="kb-watcher")
+
+    async def stop(self) -> None:
+        """Stop watching, letting an in-progress re-index finish."""
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._task, _STOP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Knowledge-base watcher did not stop in time; cancelled")
+        finally:
+            self._task = None
+
+    async def _run(self) -> None:
+        backend = "inotify/watchfiles" if watchfiles is not None else "polling"
+        logger.info("Watching %s for knowledge-base changes (%s)", self.directory, backend)
+        changes = self._watch() if watchfiles is not None else self._poll()
+        async for changed in changes:
+            logger.info("Knowledge-base change detected: %s", ", ".join(sorted(changed)))
+            try:
+                async with AsyncSessionLocal() as session:
+                    await rag_service.index_knowledge_base(session)
+            except Exception:
+                # Keep watching: the next save may well fix the problem
+                logger.exception("Live knowledge-base re-index failed")
+
+    async def _watch(self) -> AsyncIterator[set[str]]:
+        """Yield changed filenames from filesystem notifications."""
+        step_ms = max(int(self.debounce_seconds * 1000), 1)
+        async for changes in watchfiles.awatch(
+            self.directory,
+            watch_filter=lambda _change, path: _is_markdown(path),
+            step=step_ms,
+            debounce=step_ms * _MAX_DEBOUNCE_PERIODS,
+            stop_event=self._stop,
+            recursive=False,
+        ):
+            yield {Path(path).name for _change, path in changes}
+
+    async def _poll(self) -> AsyncIterator[set[str]]:
+        """Yield changed filenames by comparing periodic directory scans."""
+        previous = await asyncio.to_thread(_scan, self.directory)
+        changed: set[str] = set()
+        first_change = last_change = 0.0
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.poll_seconds)
+                return
+            except asyncio.TimeoutError:
+                pass
+
+            current = await asyncio.to_thread(_scan, self.directory)
+            now = time.monotonic()
+            if current != previous:
+                names = previous.keys() | current.keys()
+                changed |= {n for n in names if previous.get(n) != current.get(n)}
+                previous = current
+                first_change = first_change or now
+                last_change = now
+            if changed and (
+                now - last_change >= self.debounce_seconds
+                or now - first_change >= self.debounce_seconds * _MAX_DEBOUNCE_PERIODS
+            ):
+                yield changed
+                changed = set()
+                first_change = 0.0
+
+
+# Module-level singleton
+kb_watcher = KnowledgeBaseWatcher(
+    Path(settings.knowledge_base_dir),
+    settings.kb_watch_debounce_seconds,
+    settings.kb_watch_poll_seconds,
+)
@@ -0,0 +1,179 @@
+"""In-process BM25 inverted index over knowledge chunks.
+
+The knowledge base is small and changes rarely, so a full copy of the
+chunk index fits comfortably in memory.  Searching it takes
+microseconds and needs no database round trip, while FTS5 in SQLite stays
+the source of truth and the fallback.
+
+The index is an immutable :class:`KnowledgeSnapshot`.  Re-indexing
+builds a new snapshot off the event loop and swaps it in with a single
+reference assignment, so readers never lock and never see a half-built
+index.
+
+Query semantics mirror the FTS path: the same folding, stopword
+handling and stemming (:mod:`app.services.search_text`), stems expanded
+as prefixes over the vocabulary, and the same per-column BM25 weights.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+from collections.abc import Collection
+from dataclasses import dataclass
+from operator import itemgetter
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.knowledge_chunk import KnowledgeChunk
+from app.services.search_text import query_terms, stem, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Standard BM25 saturation and length-normalisation parameters
+_K1 = 1.2
+_B = 0.75
+
+ChunkRow = tuple[str, str, str, str, int]  # (chunk_id, title, content, source_file, chunk_index)
+SearchHit = tuple[str, str, str, str, int, float]  # ChunkRow + BM25 score
+
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    """Immutable inverted index over one version of knowledge_chunks."""
+
+    rows: tuple[ChunkRow, ...]
+    positions: dict[str, int]  # chunk_id -> index into rows
+    length_norms: tuple[float, ...]  # per-doc BM25 denominator term
+    postings: dict[str, tuple[tuple[int, float], ...]]  # term -> (doc, weighted tf)
+    vocabulary: tuple[str, ...]  # sorted, for prefix expansion
+
+    @classmethod
+    def build(
+        cls,
+        chunks: list[tuple[str, str, str, str | None, str, int]],
+        weights: tuple[float, float, float],
+    ) -> KnowledgeSnapshot:
+        """Index ``(chunk_id, title, content, keywords, source_file, chunk_index)``.
+
+        *weights* scale term frequencies in title, content and keywords.
+        """
+        postings: dict[str, list[tuple[int, float]]] = {}
+        doc_lengths: list[float] = []
+        rows: list[ChunkRow] = []
+        for doc, (chunk_id, title, content, keywords, source, index) in enumerate(chunks):
+            frequencies: dict[str, float] = {}
+            length = 0
+            for field, weight in zip((title, content, keywords or ""), weights):
+                tokens = tokenize(field)
+                length += len(tokens)
+                for token in tokens:
+                    frequencies[token] = frequencies.get(token, 0.0) + weight
+            for term, frequency in frequencies.items():
+                postings.setdefault(term, []).append((doc, frequency))
+            doc_lengths.append(float(length))
+            rows.append((chunk_id, title, content, source, index))
+
+        avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 1.0
+        return cls(
+            rows=tuple(rows),
+            positions={row[0]: doc for doc, row in enumerate(rows)},
+            length_norms=tuple(
+                _K1 * (1 - _B + _B * length / (avg_length or 1.0))
+                for length in doc_lengths
+            ),
+            postings={term: tuple(entries) for term, entries in postings.items()},
+            vocabulary=tuple(sorted(postings)),
+        )
+
+    def get(self, chunk_id: str) -> ChunkRow | None:
+        position = self.positions.get(chunk_id)
+        return self.rows[position] if position is not None else None
+
+    def search(self, query: str, limit: int) -> list[SearchHit]:
+        """Return up to *limit* chunks for *query* with their BM25 scores, best first."""
+        if not self.rows or limit <= 0:
+            return []
+        total = len(self.rows)
+        norms = self.length_norms
+        scores: dict[int, float] = {}
+        for term in query_terms(query):
+            matches = self._match(term)
+            if not matches:
+                continue
+            idf = math.log(1 + (total - len(matches) + 0.5) / (len(matches) + 0.5))
+            boost = idf * (_K1 + 1)
+            for doc, frequency in matches:
+                scores[doc] = scores.get(doc, 0.0) + boost * frequency / (
+                    frequency + norms[doc]
+                )
+        best = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        return [(*self.rows[doc], score) for doc, score in best]
+
+    def _match(self, term: str) -> Collection[tuple[int, float]]:
+        """Return ``(doc, frequency)`` pairs for *term*, or for all words
+        with its stem as prefix when stemming shortened it (like FTS5
+        ``"stem"*``).
+        """
+        stemmed = stem(term)
+        if stemmed == term:
+            return self.postings.get(term, ())
+
+        vocabulary = self.vocabulary
+        words: list[str] = []
+        i = bisect.bisect_left(vocabulary, stemmed)
+        while i < len(vocabulary) and vocabulary[i].startswith(stemmed):
+            words.append(vocabulary[i])
+            i += 1
+        if len(words) == 1:
+            return self.postings[words[0]]
+
+        merged: dict[int, float] = {}
+        for word in words:
+            for doc, frequency in self.postings[word]:
+                merged[doc] = merged.get(doc, 0.0) + frequency
+        return merged.items()
+
+
+class KnowledgeIndex:
+    """Holder for the current snapshot; swapped atomically on rebuild."""
+
+    def __init__(self) -> None:
+        self.snapshot: KnowledgeSnapshot | None = None
+
+    async def rebuild(
+        self,
+        session: AsyncSession,
+        weights: tuple[float, float, float],
+    ) -> None:
+        """Build a fresh snapshot from knowledge_chunks and swap it in."""
+        result = await session.execute(
+            select(
+                KnowledgeChunk.id,
+                KnowledgeChunk.title,
+                KnowledgeChunk.content,
+                KnowledgeChunk.keywords,
+                KnowledgeChunk.source_file,
+                KnowledgeChunk.chunk_index,
+            )
+        )
+        chunks = [tuple(row) for row in result.all()]
+        # Tokenising the whole corpus is CPU work -- keep it off the loop
+        snapshot = await asyncio.to_thread(KnowledgeSnapshot.build, chunks, weights)
+        self.snapshot = snapshot
+        logger.info(
+            "In-memory knowledge index ready: %d chunks, %d terms",
+            len(snapshot.rows),
+            len(snapshot.vocabulary),
+        )
+
+    def clear(self) -> None:
+        self.snapshot = None
+
+
+# Module-level singleton
+knowledge_index = KnowledgeIndex()
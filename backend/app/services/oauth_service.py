@@ -5,8 +5,7 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 
-import httpx
-
+from app.adapters.http_client import get_http_client
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -39,28 +38,29 @@ def get_google_auth_url() -> str:
 
 async def exchange_google_code(code: str) -> OAuthUserInfo:
     """Exchange an authorization code for user info."""
-    async with httpx.AsyncClient() as client:
-        # Exchange code for tokens
-        token_response = await client.post(
-            GOOGLE_TOKEN_URL,
-            data={
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": settings.google_redirect_uri,
-            },
-        )
-        token_response.raise_for_status()
-        tokens = token_response.json()
+    client = get_http_client("oauth")
+
+    # Exchange code for tokens
+    token_response = await client.post(
+        GOOGLE_TOKEN_URL,
+        data={
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": settings.google_redirect_uri,
+        },
+    )
+    token_response.raise_for_status()
+    tokens = token_response.json()
 
-        # Get user info
-        userinfo_response = await client.get(
-            GOOGLE_USERINFO_URL,
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
-        )
-        userinfo_response.raise_for_status()
-        userinfo = userinfo_response.json()
+    # Get user info
+    userinfo_response = await client.get(
+        GOOGLE_USERINFO_URL,
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    userinfo_response.raise_for_status()
+    userinfo = userinfo_response.json()
 
     return OAuthUserInfo(
         email=userinfo["email"],
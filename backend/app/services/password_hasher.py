@@ -0,0 +1,171 @@
+"""Bounded worker pool for bcrypt password hashing and verification.
+
+bcrypt is deliberately slow (~100-300 ms per call) and CPU-bound.  Run
+inline in an async endpoint it freezes the event loop, stalling every
+chat stream on the worker, so :class:`PasswordHasher` runs it on a small
+dedicated thread pool instead (bcrypt releases the GIL while hashing).
+
+The pool is separate from the default executor, so a login burst cannot
+crowd out ``asyncio.to_thread`` work such as knowledge-base parsing.
+Calls beyond the workers wait in a bounded queue; when that is full
+:class:`PasswordHasherBusyError` is raised straight away and the API
+layer answers ``503 Service Unavailable`` with a ``Retry-After`` header.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+import bcrypt
+
+from app.config import settings
+
+T = TypeVar("T")
+
+# Number of recent queue-wait samples kept for percentile reporting
+_WAIT_SAMPLES = 1024
+
+# Stored for accounts that cannot log in with a password (e.g. created by
+# OAuth).  Not a bcrypt hash, so no password ever verifies against it.
+UNUSABLE_PASSWORD_HASH = "!"
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the hashing queue is full."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+# bcrypt is used directly -- passlib is incompatible with bcrypt>=4.1
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+class PasswordHasher:
+    """bcrypt on a size-limited thread pool, with queue metrics."""
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self._max_workers = max(max_workers, 1)
+        self._max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0  # running or queued calls
+
+        # Metrics
+        self._avg_run = 0.2  # EWMA of bcrypt time per call, seconds
+        self._wait_samples: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def hash(self, password: str) -> str:
+        """Return a bcrypt hash of *password*."""
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Check *password* against *hashed_password*.
+
+        Hashes that are not bcrypt, such as :data:`UNUSABLE_PASSWORD_HASH`,
+        never match and cost nothing.
+        """
+        if not hashed_password.startswith("$2"):
+            return False
+        return await self._run(_verify, password, hashed_password)
+
+    async def _run(self, func: Callable[..., T], *args: str) -> T:
+        if self._pending >= self._max_workers + self._max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusyError(self._retry_after())
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="bcrypt"
+            )
+
+        enqueued_at = time.monotonic()
+
+        def job() -> tuple[T, float, float]:
+            started = time.monotonic()
+            result = func(*args)
+            return result, started - enqueued_at, time.monotonic() - started
+
+        # A cancelled caller stops waiting, but a started bcrypt call runs to
+        # the end; count it as pending until the worker is actually free
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(job)
+        self._pending += 1
+        future.add_done_callback(lambda _: self._job_done(loop))
+        result, waited, ran = await asyncio.wrap_future(future)
+        self._record(waited, ran)
+        return result
+
+    def _job_done(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Release a queue place from whichever thread finished the job."""
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:  # loop already closed
+            self._release()
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; a later call starts a new pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _record(self, waited: float, ran: float) -> None:
+        self.completed += 1
+        self._avg_run = 0.8 * self._avg_run + 0.2 * ran
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self._wait_samples.append(waited)
+
+    def _retry_after(self) -> int:
+        """Rough seconds until the queue has room again."""
+        backlog = (self._pending - self._max_workers + 1) / self._max_workers
+        return max(1, math.ceil(self._avg_run * backlog))
+
+    def stats(self) -> dict:
+        """Return queue depth, call counters and queue-wait times."""
+        samples = sorted(self._wait_samples)
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        return {
+            "active": min(self._pending, self._max_workers),
+            "queued": max(0, self._pending - self._max_workers),
+            "max_workers": self._max_workers,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_seconds_avg": self._avg_run,
+            "queue_wait_seconds_total": self.wait_seconds_total,
+            "queue_wait_seconds_max": self.wait_seconds_max,
+            "queue_wait_seconds_p50": percentile(0.50),
+            "queue_wait_seconds_p95": percentile(0.95),
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
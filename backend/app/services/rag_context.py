@@ -0,0 +1,163 @@
+"""Relevance-gated, token-budgeted knowledge-base context for chat turns.
+
+Search returns the top hits whatever their quality.  Before the hits go
+into the system prompt they are reduced here:
+
+* **Gated**: a query with no content words ("o que é isso?") gets no
+  context, and hits scoring below ``rag_min_relative_score`` times the
+  best hit are dropped.  Scores are compared only within one result list,
+  so this works the same for FTS5, in-memory BM25 and hybrid rankings.
+* **Merged**: neighbouring chunks of the same file become one passage,
+  without the heading and overlap text they repeat.
+* **Budgeted**: passages are added best first within
+  ``rag_context_token_budget``.  With ``rag_snippet_words`` set, or when a
+  passage does not fit, only its densest window of query-term matches is
+  sent, like FTS5 ``snippet()`` but for every retrieval path.
+"""
+
+from __future__ import annotations
+
+from app.services.context_builder import estimate_tokens
+from app.services.search_text import has_content_terms, query_terms, stem, tokenize
+
+# Windows shorter than this carry too little context to be worth sending
+_MIN_SNIPPET_WORDS = 15
+
+_ELLIPSIS = "…"
+
+
+def select_rag_context(
+    chunks: list[dict],
+    query: str,
+    token_budget: int,
+    min_relative_score: float = 0.0,
+    snippet_words: int = 0,
+) -> list[dict]:
+    """Return the passages of *chunks* worth sending for *query*, best first.
+
+    *chunks* are :func:`rag_service.search_knowledge` results.  Returned
+    passages are shallow copies with ``content`` replaced.  Merged
+    passages keep the first chunk's ``chunk_id`` and list all merged IDs
+    under ``chunk_ids``.
+    """
+    if not chunks or not has_content_terms(query):
+        return []
+
+    best = max(chunk.get("score", 0.0) for chunk in chunks)
+    relevant = [
+        chunk for chunk in chunks
+        if best <= 0 or chunk.get("score", best) >= best * min_relative_score
+    ]
+    stems = tuple(stem(term) for term in query_terms(query))
+
+    selected: list[dict] = []
+    remaining = token_budget
+    for passage in _merge_adjacent(relevant):
+        content = passage["content"]
+        if snippet_words > 0:
+            content = _snippet(content, stems, snippet_words)
+        overhead = estimate_tokens(f"[{passage['title']}]\n")
+        cost = overhead + estimate_tokens(content)
+        if cost > remaining:
+            content = _fit_snippet(content, stems, remaining - overhead)
+            if content is None:
+                break
+            cost = overhead + estimate_tokens(content)
+        selected.append({**passage, "content": content})
+        remaining -= cost
+    return selected
+
+
+def _merge_adjacent(chunks: list[dict]) -> list[dict]:
+    """Join runs of consecutive chunks of one file, in best-hit order."""
+    by_file: dict[str, list[tuple[int, dict]]] = {}
+    for position, chunk in enumerate(chunks):
+        source = chunk.get("source_file") or chunk["chunk_id"]
+        by_file.setdefault(source, []).append((position, chunk))
+
+    passages: list[tuple[int, dict]] = []  # (position of best member, passage)
+    for members in by_file.values():
+        members.sort(key=lambda member: member[1].get("chunk_index", 0))
+        run = [members[0]]
+        for member in members[1:]:
+            if member[1].get("chunk_index", 0) == run[-1][1].get("chunk_index", 0) + 1:
+                run.append(member)
+            else:
+                passages.append(_join(run))
+                run = [member]
+        passages.append(_join(run))
+    passages.sort(key=lambda item: item[0])
+    return [passage for _, passage in passages]
+
+
+def _join(run: list[tuple[int, dict]]) -> tuple[int, dict]:
+    """Return ``(best position, passage)`` for consecutive chunks of one file.
+
+    Blocks a chunk repeats from earlier ones (its section heading and
+    the overlap carried over by the chunker) are dropped.
+    """
+    best = min(position for position, _ in run)
+    chunks = [chunk for _, chunk in run]
+    if len(chunks) == 1:
+        return best, {**chunks[0], "chunk_ids": [chunks[0]["chunk_id"]]}
+
+    seen: set[str] = set()
+    blocks: list[str] = []
+    for chunk in chunks:
+        for block in chunk["content"].split("\n\n"):
+            if block not in seen:
+                seen.add(block)
+                blocks.append(block)
+    return best, {
+        **chunks[0],
+        "content": "\n\n".join(blocks),
+        "chunk_ids": [chunk["chunk_id"] for chunk in chunks],
+        "score": max(chunk.get("score", 0.0) for chunk in chunks),
+    }
+
+
+def _snippet(content: str, stems: tuple[str, ...], max_words: int) -> str:
+    """Return the *max_words*-word window of *content* with most term hits.
+
+    A leading markdown heading is kept, so the window keeps its context.
+    """
+    heading = ""
+    if content.startswith("#"):
+        heading, _, content = content.partition("\n\n")
+        if not content:
+            return heading
+    words = content.split()
+    if len(words) <= max_words:
+        window = content
+    else:
+        hits = [
+            any(token.startswith(stems) for token in tokenize(word)) if stems else False
+            for word in words
+        ]
+        # Sliding window over the hit flags: linear in the chunk length
+        count = best_count = sum(hits[:max_words])
+        best_start = 0
+        for start in range(1, len(words) - max_words + 1):
+            count += hits[start + max_words - 1] - hits[start - 1]
+            if count > best_count:
+                best_count, best_start = count, start
+        window = " ".join(words[best_start : best_start + max_words])
+        if best_start > 0:
+            window = f"{_ELLIPSIS} {window}"
+        if best_start + max_words < len(words):
+            window = f"{window} {_ELLIPSIS}"
+    return f"{heading}\n\n{window}" if heading else window
+
+
+def _fit_snippet(content: str, stems: tuple[str, ...], token_budget: int) -> str | None:
+    """Return the largest snippet of *content* within *token_budget*, if useful."""
+    words = len(content.split())
+    if not words or token_budget <= 0:
+        return None
+    max_words = min(words, int(words * token_budget / estimate_tokens(content)))
+    while max_words >= _MIN_SNIPPET_WORDS:
+        snippet = _snippet(content, stems, max_words)
+        if estimate_tokens(snippet) <= token_budget:
+            return snippet
+        max_words = int(max_words * 0.9)
+    return None
@@ -2,21 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from pathlib import Path
 
-import frontmatter
-from sqlalchemy import select, text
+from sqlalchemy import delete, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from app.config import settings
+from app.db.fts import FtsIndex
 from app.models.knowledge_chunk import KnowledgeChunk
+from app.models.knowledge_file import KnowledgeFile
+from app.services.answer_cache import answer_cache
+from app.services.dense_index import dense_enabled, dense_index, numpy_available
+from app.services.kb_ingest import CHUNKER_VERSION, ParsedFile, parse_files
+from app.services.knowledge_index import SearchHit, knowledge_index
+from app.services.search_cache import knowledge_search_cache
+from app.services.search_text import build_fts_query, search_key_terms
 
 logger = logging.getLogger(__name__)
 
-# Target chunk size in characters, with overlap for context continuity
-_CHUNK_SIZE = 500
-_CHUNK_OVERLAP = 100
+# Minimum interval between progress log lines during a large re-index
+_PROGRESS_LOG_SECONDS = 5.0
 
 
 # ---------------------------------------------------------------------------
@@ -24,34 +32,44 @@ _CHUNK_OVERLAP = 100
 # ---------------------------------------------------------------------------
 
 
+# External-content index: FTS5 stores only the index and reads title,
+# content and keywords back from knowledge_chunks by rowid
+_KNOWLEDGE_FTS = FtsIndex(
+    "knowledge_chunks_fts", "knowledge_chunks", ("title", "content", "keywords")
+)
+
+# bm25() column weights for (title, content, keywords): a hit in a
+# document's title or curated keywords says more than one in body text
+_BM25_WEIGHTS = (2.0, 1.0, 3.0)
+
+# Hybrid retrieval: candidates per retriever (x top_k) and the usual
+# reciprocal-rank-fusion damping constant
+_HYBRID_CANDIDATE_FACTOR = 4
+_RRF_K = 60
+
+
 async def init_fts(engine: AsyncEngine) -> None:
-    """Create the FTS5 virtual table that mirrors knowledge_chunks.
+    """Create the external-content FTS5 index over knowledge_chunks.
 
-    This is called once at application startup.  The FTS5 virtual table
-    enables fast full-text search on chunk content, titles and keywords.
+    This is called once at application startup.  An FTS5 table created
+    with a different definition by an older version (e.g. a standalone
+    table duplicating every chunk's text, or another tokenizer) is
+    dropped and replaced, and the new index is built from the existing
+    chunks.  Afterwards, triggers keep it in sync on every insert, update
+    and delete, so no rebuild is needed during normal operation.
+
+    The index is keyed on knowledge_chunks' implicit ``rowid``, which a
+    ``VACUUM`` may renumber; run :func:`rebuild_fts` after vacuuming.
     """
     async with engine.begin() as conn:
-        # Create FTS5 virtual table if it doesn't already exist
-        await conn.execute(
-            text(
-                "CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_chunks_fts "
-                "USING fts5(chunk_id, title, content, keywords)"
-            )
-        )
+        await _KNOWLEDGE_FTS.ensure(conn)
     logger.info("FTS5 virtual table ready")
 
 
-async def _rebuild_fts(session: AsyncSession) -> None:
-    """Rebuild the FTS5 index from the knowledge_chunks table."""
-    await session.execute(text("DELETE FROM knowledge_chunks_fts"))
-    await session.execute(
-        text(
-            "INSERT INTO knowledge_chunks_fts (chunk_id, title, content, keywords) "
-            "SELECT id, title, content, COALESCE(keywords, '') FROM knowledge_chunks"
-        )
-    )
-    await session.commit()
-    logger.info("FTS5 index rebuilt")
+async def rebuild_fts(engine: AsyncEngine) -> None:
+    """Rebuild the whole FTS5 index from knowledge_chunks (repair only)."""
+    async with engine.begin() as conn:
+        await _KNOWLEDGE_FTS.rebuild(conn)
 
 
 # ---------------------------------------------------------------------------
@@ -59,106 +77,170 @@ async def _rebuild_fts(session: AsyncSession) -> None:
 # ---------------------------------------------------------------------------
 
 
-def _chunk_text(text_body: str, chunk_size: int = _CHUNK_SIZE, overlap: int = _CHUNK_OVERLAP) -> list[str]:
-    """Split text into overlapping chunks of roughly *chunk_size* characters.
-
-    Splits on paragraph boundaries (double newlines) when possible, then
-    falls back to sentence-level splitting to avoid cutting mid-word.
-    """
-    if len(text_body) <= chunk_size:
-        return [text_body.strip()] if text_body.strip() else []
-
-    chunks: list[str] = []
-    start = 0
-    length = len(text_body)
-
-    while start < length:
-        end = min(start + chunk_size, length)
-
-        # If not at the end, try to find a good break point
-        if end < length:
-            # Try paragraph break first
-            para_break = text_body.rfind("\n\n", start, end)
-            if para_break > start:
-                end = para_break + 2  # include the double-newline
-            else:
-                # Try sentence break
-                for sep in (". ", ".\n", "! ", "? "):
-                    sent_break = text_body.rfind(sep, start, end)
-                    if sent_break > start:
-                        end = sent_break + len(sep)
-                        break
-
-        chunk = text_body[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-
-        # Move start forward with overlap
-        start = max(start + 1, end - overlap)
-
-    return chunks
+def _scan_markdown(kb_dir: Path) -> dict[str, tuple[Path, int, int]]:
+    """Return ``{filename: (path, mtime_ns, size)}`` for every markdown file."""
+    files: dict[str, tuple[Path, int, int]] = {}
+    for path in sorted(kb_dir.glob("*.md")):
+        stat = path.stat()
+        files[path.name] = (path, stat.st_mtime_ns, stat.st_size)
+    return files
 
 
 async def index_knowledge_base(session: AsyncSession) -> None:
-    """Read all markdown files from the knowledge base directory and index them.
-
-    Files already indexed (based on source_file name) are skipped, so this
-    is safe to call on every startup.
+    """Bring the index in line with the markdown files on disk.
+
+    The ``knowledge_files`` manifest records each file's size, mtime and
+    SHA-256 content hash.  Files whose size and mtime are unchanged are
+    skipped without being read; files whose hash changed, or that were
+    chunked by an older :data:`kb_ingest.CHUNKER_VERSION`, are re-chunked;
+    files that disappeared have their chunks removed.  Only the affected
+    FTS rows are touched, so the cost of a call tracks the size of the
+    change rather than the size of the corpus.  Safe to call repeatedly.
+
+    Directory scanning, hashing and chunking run off the event loop (in a
+    process pool for large batches, see :mod:`app.services.kb_ingest`).
+    Chunks are streamed into bulk inserts of ``kb_ingest_batch_rows`` as
+    files finish parsing.  The FTS index follows chunk inserts and deletes
+    through triggers.
     """
     kb_dir = Path(settings.knowledge_base_dir)
     if not kb_dir.exists():
         logger.warning("Knowledge base directory not found: %s", kb_dir)
         return
 
-    md_files = sorted(kb_dir.glob("*.md"))
-    if not md_files:
-        logger.info("No markdown files found in %s", kb_dir)
-        return
-
-    # Determine which files are already indexed
-    result = await session.execute(
-        select(KnowledgeChunk.source_file).distinct()
-    )
-    indexed_files: set[str] = {row[0] for row in result.all()}
-
-    new_count = 0
-    for md_path in md_files:
-        filename = md_path.name
-        if filename in indexed_files:
-            logger.debug("Skipping already-indexed file: %s", filename)
+    md_files = await asyncio.to_thread(_scan_markdown, kb_dir)
+
+    result = await session.execute(select(KnowledgeFile))
+    manifest = {entry.source_file: entry for entry in result.scalars().all()}
+    # Files indexed before the manifest existed only show up as chunks
+    result = await session.execute(select(KnowledgeChunk.source_file).distinct())
+    chunked_files: set[str] = {row[0] for row in result.all()}
+
+    jobs: list[tuple[Path, str | None]] = []
+    for filename, (path, mtime_ns, size) in md_files.items():
+        entry = manifest.get(filename)
+        if entry is None or entry.chunker_version != CHUNKER_VERSION:
+            # New file, or chunked by an older chunker: always re-chunk
+            jobs.append((path, None))
+        elif entry.mtime_ns != mtime_ns or entry.size != size:
+            jobs.append((path, entry.content_hash))
+
+    dense_dim = settings.rag_dense_dim if dense_enabled() else None
+    batch: list[dict] = []
+    added = updated = removed = chunk_total = 0
+    started = last_report = time.monotonic()
+
+    async for path, parsed in parse_files(jobs, settings.kb_ingest_workers, dense_dim):
+        filename = path.name
+        if isinstance(parsed, Exception):
+            logger.error("Failed to index %s: %s", filename, parsed)
             continue
 
-        try:
-            post = frontmatter.load(str(md_path))
-        except Exception:
-            logger.exception("Failed to parse frontmatter from %s", filename)
+        _, mtime_ns, size = md_files[filename]
+        entry = manifest.get(filename)
+        if parsed.chunks is None:
+            # Touched but not modified -- just remember the new stat info
+            entry.mtime_ns = mtime_ns
+            entry.size = size
             continue
 
-        title = post.get("title", filename)
-        keywords = post.get("keywords", "")
-
-        # Chunk the content body
-        chunks = _chunk_text(post.content)
-
-        for idx, chunk_text in enumerate(chunks):
-            chunk = KnowledgeChunk(
-                source_file=filename,
-                title=title,
-                content=chunk_text,
-                chunk_index=idx,
-                keywords=keywords,
+        if entry is not None or filename in chunked_files:
+            await _delete_file_chunks(session, filename)
+            updated += 1
+        else:
+            added += 1
+        batch.extend(_chunk_rows(filename, parsed))
+        if len(batch) >= settings.kb_ingest_batch_rows:
+            await _insert_chunk_rows(session, batch)
+            batch = []
+
+        if entry is None:
+            entry = KnowledgeFile(source_file=filename)
+            session.add(entry)
+            manifest[filename] = entry
+        entry.content_hash = parsed.content_hash
+        entry.mtime_ns = mtime_ns
+        entry.size = size
+        entry.chunk_count = len(parsed.chunks)
+        entry.chunker_version = CHUNKER_VERSION
+        chunk_total += len(parsed.chunks)
+
+        now = time.monotonic()
+        if now - last_report >= _PROGRESS_LOG_SECONDS:
+            last_report = now
+            logger.info(
+                "Indexing knowledge base: %d/%d files, %d chunks (%.0f chunks/s)",
+                added + updated,
+                len(jobs),
+                chunk_total,
+                chunk_total / (now - started),
             )
-            session.add(chunk)
-            new_count += 1
+    if batch:
+        await _insert_chunk_rows(session, batch)
 
-    if new_count:
-        await session.commit()
-        logger.info("Indexed %d new chunks from %d files", new_count, len(md_files) - len(indexed_files))
+    for filename in (manifest.keys() | chunked_files) - md_files.keys():
+        await _delete_file_chunks(session, filename)
+        if filename in manifest:
+            await session.delete(manifest[filename])
+        removed += 1
 
-        # Rebuild the FTS index to include new data
-        await _rebuild_fts(session)
+    await session.commit()
+
+    changed = bool(added or updated or removed)
+    if settings.rag_memory_index_enabled and (
+        changed or knowledge_index.snapshot is None
+    ):
+        await knowledge_index.rebuild(session, _BM25_WEIGHTS)
+    if dense_enabled() and (changed or not dense_index.ready):
+        await dense_index.load(session)
+    elif settings.rag_dense_enabled and not numpy_available():
+        logger.warning("RAG_DENSE_ENABLED is set but numpy is not installed")
+
+    if changed:
+        elapsed = time.monotonic() - started
+        logger.info(
+            "Knowledge base re-indexed: %d added, %d updated, %d removed files; "
+            "%d chunks in %.1fs (%.0f chunks/s)",
+            added,
+            updated,
+            removed,
+            chunk_total,
+            elapsed,
+            chunk_total / elapsed if elapsed > 0 else 0.0,
+        )
+        # Cached answers and search results were keyed on the old chunks
+        answer_cache.clear()
+        knowledge_search_cache.bump()
     else:
-        logger.info("Knowledge base already up-to-date; no new files to index")
+        logger.info("Knowledge base already up-to-date; no changed files to index")
+
+
+def _chunk_rows(filename: str, parsed: ParsedFile) -> list[dict]:
+    """Return ``knowledge_chunks`` rows for one parsed file."""
+    embeddings = parsed.embeddings or [None] * len(parsed.chunks)
+    return [
+        {
+            "source_file": filename,
+            "title": parsed.title,
+            "content": chunk,
+            "chunk_index": idx,
+            "keywords": parsed.keywords,
+            "embedding": embedding,
+        }
+        for idx, (chunk, embedding) in enumerate(zip(parsed.chunks, embeddings))
+    ]
+
+
+async def _insert_chunk_rows(session: AsyncSession, rows: list[dict]) -> None:
+    """Bulk-insert chunk rows with one ``executemany``."""
+    await session.execute(insert(KnowledgeChunk), rows)
+
+
+async def _delete_file_chunks(session: AsyncSession, filename: str) -> None:
+    """Remove one file's chunks (the delete trigger updates the FTS index)."""
+    await session.execute(
+        delete(KnowledgeChunk).where(KnowledgeChunk.source_file == filename)
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -173,46 +255,138 @@ async def search_knowledge(
 ) -> list[dict]:
     """Search the knowledge base using FTS5 MATCH.
 
-    Returns a list of dicts with keys: ``title``, ``content``, ``source``.
+    The query is reduced to its content words (see
+    :func:`search_text.build_fts_query`) and results are ranked with
+    column-weighted BM25.  Lookups are served from the in-process
+    snapshot (see :mod:`app.services.knowledge_index`) when enabled and
+    from FTS5 otherwise.  With hybrid retrieval on (see
+    :mod:`app.services.dense_index`), keyword and dense candidates are
+    merged with reciprocal rank fusion.  Results are cached until the
+    next re-index (see :mod:`app.services.search_cache`).
+
+    Returns a list of dicts with keys: ``chunk_id``, ``title``,
+    ``content``, ``source``, ``source_file``, ``chunk_index`` and
+    ``score`` (higher is better, comparable only within one result list).
     """
     if not query or not query.strip():
         return []
 
-    # Sanitize query for FTS5: remove special characters, keep words
-    clean_words = []
-    for word in query.split():
-        sanitized = "".join(ch for ch in word if ch.isalnum())
-        if sanitized:
-            clean_words.append(sanitized)
+    cache_key = knowledge_search_cache.key(search_key_terms(query), top_k)
+    cached = knowledge_search_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    if not clean_words:
-        return []
+    results = await _search_knowledge(session, query, top_k)
+    knowledge_search_cache.put(cache_key, results)
+    return results
+
+
+async def _search_knowledge(
+    session: AsyncSession,
+    query: str,
+    top_k: int,
+) -> list[dict]:
+    """Run retrieval for :func:`search_knowledge`, bypassing the cache."""
+    hybrid = dense_enabled() and dense_index.ready
+    limit = top_k * _HYBRID_CANDIDATE_FACTOR if hybrid else top_k
+    snapshot = knowledge_index.snapshot if settings.rag_memory_index_enabled else None
+    if snapshot is not None:
+        hits = snapshot.search(query, limit)
+    else:
+        hits = await _fts_search(session, query, limit)
+    if not hybrid:
+        return [_chunk_result(*hit) for hit in hits]
+
+    dense_hits = await dense_index.asearch(query, limit)
+    fused = _reciprocal_rank_fusion(
+        [[hit[0] for hit in hits], [chunk_id for chunk_id, _ in dense_hits]]
+    )[:top_k]
+
+    by_id = {hit[0]: hit[:5] for hit in hits}
+    if snapshot is not None:
+        for chunk_id, _ in fused:
+            row = snapshot.get(chunk_id)
+            if row is not None:
+                by_id.setdefault(chunk_id, row)
+    missing = [chunk_id for chunk_id, _ in fused if chunk_id not in by_id]
+    if missing:
+        result = await session.execute(
+            select(
+                KnowledgeChunk.id,
+                KnowledgeChunk.title,
+                KnowledgeChunk.content,
+                KnowledgeChunk.source_file,
+                KnowledgeChunk.chunk_index,
+            ).where(KnowledgeChunk.id.in_(missing))
+        )
+        by_id.update((row[0], tuple(row)) for row in result.all())
+    return [
+        _chunk_result(*by_id[chunk_id], score)
+        for chunk_id, score in fused
+        if chunk_id in by_id
+    ]
 
-    # Use OR between words so partial matches are included
-    fts_query = " OR ".join(clean_words)
+
+async def _fts_search(
+    session: AsyncSession,
+    query: str,
+    limit: int,
+) -> list[SearchHit]:
+    """Return ``(chunk_id, title, content, source_file, chunk_index, score)``
+    hits for *query*, best first (score is the negated ``bm25()``).
+    """
+    fts_query = build_fts_query(query)
+    if not fts_query:
+        return []
 
     try:
         result = await session.execute(
             text(
-                "SELECT chunk_id, title, content, "
-                "rank "
-                "FROM knowledge_chunks_fts "
+                "SELECT c.id, c.title, c.content, c.source_file, c.chunk_index, "
+                "bm25(knowledge_chunks_fts, :w_title, :w_content, :w_keywords) AS score "
+                "FROM knowledge_chunks_fts AS fts "
+                "JOIN knowledge_chunks AS c ON c.rowid = fts.rowid "
                 "WHERE knowledge_chunks_fts MATCH :query "
-                "ORDER BY rank "
+                "ORDER BY score "
                 "LIMIT :limit"
             ),
-            {"query": fts_query, "limit": top_k},
+            {
+                "query": fts_query,
+                "limit": limit,
+                "w_title": _BM25_WEIGHTS[0],
+                "w_content": _BM25_WEIGHTS[1],
+                "w_keywords": _BM25_WEIGHTS[2],
+            },
         )
-        rows = result.all()
     except Exception:
         logger.exception("FTS5 search failed for query: %s", query)
         return []
-
-    return [
-        {
-            "title": row[1],
-            "content": row[2],
-            "source": row[1],  # use title as human-readable source
-        }
-        for row in rows
-    ]
+    return [(*row[:5], -row[5]) for row in result.all()]
+
+
+def _reciprocal_rank_fusion(rankings: list[list[str]]) -> list[tuple[str, float]]:
+    """Merge several best-first ID lists into ``(id, fused score)``, best first."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (_RRF_K + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def _chunk_result(
+    chunk_id: str,
+    title: str,
+    content: str,
+    source_file: str,
+    chunk_index: int,
+    score: float,
+) -> dict:
+    return {
+        "chunk_id": chunk_id,
+        "title": title,
+        "content": content,
+        "source": title,  # use title as human-readable source
+        "source_file": source_file,
+        "chunk_index": chunk_index,
+        "score": score,  # higher is better; only comparable within one query
+    }
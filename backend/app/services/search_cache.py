@@ -0,0 +1,77 @@
+"""Generation-aware LRU caches for knowledge and video search results.
+
+Popular questions trigger identical retrieval over and over -- from chat
+turns and from the search endpoints.  Results depend only on the query's
+search terms, the result limit and the indexed data, so they are cached
+under ``(generation, terms, limit)``.
+
+Every writer of the underlying data (``index_knowledge_base``,
+``load_trusted_videos``) calls :meth:`SearchCache.bump`.  Because the
+generation is part of the key, a search that started before a re-index
+and finishes after it stores its result under the old generation, where
+it can never be served again.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from app.config import settings
+
+
+class SearchCache:
+    """Size-bounded LRU of search results with a data generation counter."""
+
+    def __init__(self, name: str, max_entries: int) -> None:
+        self.name = name
+        self._max_entries = max_entries
+        self._entries: OrderedDict[Hashable, list[dict]] = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, terms: tuple[str, ...], limit: int) -> Hashable:
+        """Build a lookup key bound to the current generation."""
+        return (self.generation, terms, limit)
+
+    def get(self, key: Hashable) -> list[dict] | None:
+        """Return a copy of the cached results for *key*, or ``None``."""
+        results = self._entries.get(key)
+        if results is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return [dict(item) for item in results]
+
+    def put(self, key: Hashable, results: list[dict]) -> None:
+        """Store *results* under *key*, evicting the LRU entry when full."""
+        if self._max_entries <= 0 or key[0] != self.generation:
+            return
+        self._entries[key] = [dict(item) for item in results]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def bump(self) -> None:
+        """Invalidate everything: the indexed data has changed."""
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return size, generation and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_max_entries = settings.search_cache_max_entries if settings.search_cache_enabled else 0
+
+knowledge_search_cache = SearchCache("knowledge", _max_entries)
+video_search_cache = SearchCache("videos", _max_entries)
@@ -0,0 +1,114 @@
+"""Text normalisation shared by the knowledge and video search paths.
+
+Queries typically come from speech-to-text and read like natural speech
+("como que eu faço pra mandar um pix pro meu neto").  Searching on every
+word makes nearly every document match, so queries are folded to
+lowercase ASCII (matching FTS5's ``unicode61 remove_diacritics 2``
+tokenizer), stripped of pt-BR and English stopwords and lightly stemmed.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+# Upper bound on terms sent to FTS5 after stopword removal
+_MAX_QUERY_TERMS = 8
+
+# Stems shorter than this are too ambiguous for a prefix query
+_MIN_STEM_LENGTH = 4
+
+_WORD_RE = re.compile(r"\w+")
+
+# Already accent-folded, since they are compared after fold()
+STOPWORDS: frozenset[str] = frozenset(
+    # pt-BR: articles, prepositions, pronouns, fillers of spoken questions
+    """
+    a o as os um uma uns umas ao aos de do da dos das em no na nos nas
+    num numa por pelo pela pelos pelas pra pro pras pros para com sem sob
+    que e ou mas se nao sim ja so tambem mais muito muita pouco ate
+    eu tu ele ela nos vos eles elas voce voces me te lhe mim comigo
+    meu minha meus minhas teu tua seu sua seus suas nosso nossa
+    esse essa isso este esta isto aquele aquela aquilo aqui ali la ai
+    como qual quais quando onde porque porque quem quanto
+    ser estar ter tem tenho estou esta sou era foi vai vou fica
+    pode posso consigo preciso quero queria gostaria sei saber faco
+    entao tipo coisa ne ta to oi ola obrigado obrigada favor
+    """.split()
+    # en
+    + """
+    the an and or but if of to in on at by for with from about into
+    is are was were be been am do does did have has had can could
+    i you he she it we they me my your his her its our their
+    this that these those what which who whom how when where why
+    please hi hello thanks just not no yes so
+    """.split()
+)
+
+# Light pt-BR/en suffix stripping, longest suffixes first
+_SUFFIXES: tuple[str, ...] = (
+    "amentos", "imentos", "amento", "imento", "mente",
+    "acoes", "icoes", "coes", "cao", "ando", "endo", "indo",
+    "ados", "adas", "idos", "idas", "ado", "ada", "ido", "ida",
+    "ing", "ies", "ens", "ar", "er", "ir", "em", "es", "as", "os", "is",
+    "a", "e", "o", "s",
+)
+
+
+def fold(value: str) -> str:
+    """Lowercase *value* and strip diacritics ("Cartão" -> "cartao")."""
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(value: str) -> list[str]:
+    """Split *value* into folded word tokens."""
+    return _WORD_RE.findall(fold(value))
+
+
+def stem(token: str) -> str:
+    """Strip one common inflectional suffix, keeping at least 4 letters."""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM_LENGTH:
+            return token[: -len(suffix)]
+    return token
+
+
+def query_terms(query: str) -> list[str]:
+    """Return the distinct, non-stopword tokens of *query*, in order.
+
+    Falls back to all tokens if the query consists only of stopwords.
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    content = [token for token in tokens if token not in STOPWORDS]
+    return (content or tokens)[:_MAX_QUERY_TERMS]
+
+
+def has_content_terms(query: str) -> bool:
+    """Return ``True`` if *query* has at least one non-stopword token."""
+    return any(token not in STOPWORDS for token in tokenize(query))
+
+
+def search_key_terms(query: str) -> tuple[str, ...]:
+    """Return the tokens that fully determine search results for *query*.
+
+    Like :func:`query_terms` but keeping order and repeats, since the
+    dense retriever weighs repeated words.  Queries with the same key
+    terms get the same results from every retrieval path.
+    """
+    tokens = tokenize(query)
+    content = [token for token in tokens if token not in STOPWORDS]
+    return tuple(content or tokens)
+
+
+def build_fts_query(query: str) -> str:
+    """Build an FTS5 MATCH expression for *query* ('' if nothing to search).
+
+    Each term becomes a quoted token, or a prefix query on its stem when
+    stemming removed a suffix, so "mandar" also matches "mande".
+    """
+    parts: list[str] = []
+    for term in query_terms(query):
+        stemmed = stem(term)
+        parts.append(f'"{stemmed}"*' if stemmed != term else f'"{term}"')
+    return " OR ".join(parts)
@@ -2,10 +2,30 @@
 
 import io
 
+import httpx
 import openai
 
+from app.adapters.http_client import get_http_client
 from app.config import settings
 
+_client: openai.AsyncOpenAI | None = None
+_client_pool: httpx.AsyncClient | None = None  # the pool _client was built on
+
+
+def _get_client() -> openai.AsyncOpenAI:
+    """Return the Whisper client, bound to the shared OpenAI connection pool."""
+    global _client, _client_pool
+    http_client = get_http_client(
+        "openai", openai.DefaultAsyncHttpxClient, settings.llm_timeout_seconds
+    )
+    # Rebuild if the pool was replaced (e.g. after an app restart)
+    if _client is None or _client_pool is not http_client:
+        _client = openai.AsyncOpenAI(
+            api_key=settings.openai_api_key, http_client=http_client
+        )
+        _client_pool = http_client
+    return _client
+
 
 async def transcribe_audio(audio_data: bytes, language: str = "pt-BR") -> str:
     """Transcribe audio bytes using OpenAI's Whisper model.
@@ -22,7 +42,7 @@ async def transcribe_audio(audio_data: bytes, language: str = "pt-BR") -> str:
     str
         The transcribed text.
     """
-    client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+    client = _get_client()
 
     audio_file = io.BytesIO(audio_data)
     audio_file.name = "audio.webm"
@@ -0,0 +1,87 @@
+"""LRU cache of already-verified JWTs and their claims.
+
+Clients reuse one access token for up to ``access_token_expire_minutes``,
+and :func:`app.middleware.auth.decode_token` would otherwise check its
+HMAC signature and parse its claims on every request.  Verified tokens
+are remembered here under the SHA-256 digest of the token string, so the
+cache never holds bearer credentials themselves.
+
+An entry lives exactly as long as the token: once the ``exp`` claim is
+reached the entry is dropped and the lookup misses, so ``jwt.decode``
+rejects the token as expired just as it would without the cache.  Only
+tokens that passed verification are stored, and tokens without ``exp``
+are never cached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+
+from app.config import settings
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache:
+    """Size-bounded LRU of verified token claims with hit/miss counters."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, token: str) -> dict | None:
+        """Return a copy of the claims of a verified, unexpired *token*."""
+        if self._max_entries <= 0:
+            return None
+        key = _digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(claims)
+
+    def put(self, token: str, claims: dict) -> None:
+        """Remember that *token* verified to *claims*, until its ``exp``."""
+        expires_at = claims.get("exp")
+        if self._max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        key = _digest(token)
+        self._entries[key] = (float(expires_at), dict(claims))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after rotating the signing key)."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache(
+    max_entries=settings.token_cache_max_entries if settings.token_cache_enabled else 0,
+)
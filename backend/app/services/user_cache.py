@@ -0,0 +1,96 @@
+"""In-process cache of authenticated users, keyed by the token's ``sub``.
+
+Every authenticated request resolves its bearer token to a ``User``.
+Re-selecting the same row on each chat, TTS or search call costs a
+database round trip for data that rarely changes, so
+:func:`app.middleware.auth.get_current_user` keeps column snapshots here
+for a short TTL.
+
+Each request gets its own detached ``User`` built from the snapshot, so
+handlers may modify it and ``session.add`` it as if it had just been
+loaded.  Writers of user rows call :meth:`UserCache.invalidate`; the TTL
+bounds staleness across worker processes, which do not share the cache.
+
+A lookup that started before an invalidation must not store the row it
+read afterwards, so :meth:`UserCache.put` takes the generation observed
+before the ``SELECT`` and drops stale writes, as in
+:mod:`app.services.search_cache`.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.models.user import User
+
+# Columns copied into a snapshot; relationships are loaded on demand
+_COLUMNS = tuple(column.key for column in User.__table__.columns)
+
+
+class UserCache:
+    """TTL + LRU cache of user column snapshots with hit/miss counters."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> User | None:
+        """Return a detached copy of the cached user, or ``None`` on a miss."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, values = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, user: User, generation: int) -> None:
+        """Snapshot *user* unless the cache was invalidated since *generation*."""
+        if self._max_entries <= 0 or generation != self.generation:
+            return
+        values = {key: getattr(user, key) for key in _COLUMNS}
+        self._entries[user.id] = (time.monotonic() + self._ttl, values)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget *user_id* after its row was changed."""
+        self.generation += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+user_cache = UserCache(
+    max_entries=settings.user_cache_max_entries if settings.user_cache_enabled else 0,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
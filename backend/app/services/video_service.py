@@ -2,70 +2,143 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 from pathlib import Path
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+import yaml
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from app.config import settings
+from app.db.fts import FtsIndex
 from app.models.trusted_video import TrustedVideo
+from app.services.search_cache import video_search_cache
+from app.services.search_text import build_fts_query, has_content_terms, query_terms
 
 logger = logging.getLogger(__name__)
 
 # Path to the seed data file
 _DEFAULT_VIDEOS_PATH = Path("data/trusted_videos.json")
 
+# Columns a seed entry sets, besides the ``url`` it is keyed on
+_SEED_FIELDS = ("title", "channel_name", "category", "keywords", "is_verified")
+
+# Same tokenizer as the knowledge index, so queries fold and stem alike
+_VIDEO_FTS = FtsIndex(
+    "trusted_videos_fts", "trusted_videos", ("title", "keywords", "category")
+)
+
+# bm25() column weights for (title, keywords, category): curated keywords
+# are the strongest signal, the broad category the weakest
+_BM25_WEIGHTS = (2.0, 3.0, 1.0)
+
+
+# ---------------------------------------------------------------------------
+# FTS5 virtual table management
+# ---------------------------------------------------------------------------
+
+
+async def init_video_fts(engine: AsyncEngine) -> None:
+    """Create the external-content FTS5 index over trusted_videos.
+
+    Called once at application startup, like :func:`rag_service.init_fts`;
+    triggers keep the index in sync afterwards.
+    """
+    async with engine.begin() as conn:
+        await _VIDEO_FTS.ensure(conn)
+    logger.info("Trusted video FTS5 index ready")
+
 
 # ---------------------------------------------------------------------------
 # Loading seed data
 # ---------------------------------------------------------------------------
 
 
-async def load_trusted_videos(session: AsyncSession) -> None:
-    """Load videos from the JSON seed file into the database.
+def _seed_path() -> Path | None:
+    """Return ``settings.trusted_videos_path`` if it exists, else the JSON default."""
+    for path in (Path(settings.trusted_videos_path), _DEFAULT_VIDEOS_PATH):
+        if path.exists():
+            return path
+    return None
+
+
+def _read_seed(path: Path) -> list[dict]:
+    """Read seed entries from a JSON or YAML file.
 
-    Skips loading if the ``trusted_videos`` table already contains rows,
-    making it safe to call on every startup.
+    YAML files may hold the list itself or a mapping with a ``videos`` list.
     """
-    # Check if videos are already loaded
-    result = await session.execute(select(TrustedVideo.id).limit(1))
-    if result.scalar_one_or_none() is not None:
-        logger.info("Trusted videos already loaded; skipping seed")
-        return
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix in (".yaml", ".yml"):
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("videos", [])
+    return data or []
+
 
-    # Resolve the path -- try settings first, fall back to default
-    videos_path = Path(settings.trusted_videos_path)
-    if not videos_path.exists() or not videos_path.suffix == ".json":
-        videos_path = _DEFAULT_VIDEOS_PATH
+async def load_trusted_videos(session: AsyncSession) -> None:
+    """Upsert videos from the seed file into the database, keyed on ``url``.
 
-    if not videos_path.exists():
-        logger.warning("Trusted videos file not found: %s", videos_path)
+    New URLs are inserted and entries whose fields changed are updated,
+    each with a single ``executemany``; unchanged rows are not touched.
+    Videos added to the database by other means are left alone.
+    Idempotent, so it is safe to call on every startup.
+    """
+    videos_path = _seed_path()
+    if videos_path is None:
+        logger.warning("Trusted videos file not found: %s", settings.trusted_videos_path)
         return
 
     try:
-        with open(videos_path, "r", encoding="utf-8") as f:
-            video_data = json.load(f)
+        items = await asyncio.to_thread(_read_seed, videos_path)
     except Exception:
         logger.exception("Failed to read trusted videos file: %s", videos_path)
         return
 
-    count = 0
-    for item in video_data:
-        video = TrustedVideo(
-            title=item["title"],
-            url=item["url"],
-            channel_name=item.get("channel_name", ""),
-            category=item.get("category", ""),
-            keywords=item.get("keywords", ""),
-            is_verified=item.get("is_verified", True),
-        )
-        session.add(video)
-        count += 1
+    # Later entries win if a URL is listed twice
+    seed: dict[str, dict] = {}
+    for item in items:
+        seed[item["url"]] = {
+            "url": item["url"],
+            "title": item["title"],
+            "channel_name": item.get("channel_name", ""),
+            "category": item.get("category", ""),
+            "keywords": item.get("keywords", ""),
+            "is_verified": item.get("is_verified", True),
+        }
 
+    columns = [getattr(TrustedVideo, field) for field in _SEED_FIELDS]
+    result = await session.execute(select(TrustedVideo.id, TrustedVideo.url, *columns))
+    existing = {row.url: row for row in result.all()}
+
+    inserts: list[dict] = []
+    updates: list[dict] = []
+    for url, values in seed.items():
+        row = existing.get(url)
+        if row is None:
+            inserts.append(values)
+        elif any(getattr(row, field) != values[field] for field in _SEED_FIELDS):
+            updates.append({"id": row.id, **values})
+
+    if not inserts and not updates:
+        logger.info("Trusted videos already up-to-date with %s", videos_path)
+        return
+
+    if inserts:
+        await session.execute(insert(TrustedVideo), inserts)
+    if updates:
+        await session.execute(update(TrustedVideo), updates)
     await session.commit()
-    logger.info("Loaded %d trusted videos from %s", count, videos_path)
+    video_search_cache.bump()
+    logger.info(
+        "Loaded trusted videos from %s: %d added, %d updated",
+        videos_path,
+        len(inserts),
+        len(updates),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -78,66 +151,61 @@ async def search_videos(
     query: str,
     limit: int = 2,
 ) -> list[dict]:
-    """Find matching trusted videos by keyword overlap.
+    """Find matching trusted videos with FTS5 MATCH.
 
-    Performs a simple keyword matching: each word from the user query is
-    compared against the comma-separated keywords of every video.  Videos
-    are ranked by the number of matching keywords.
+    The query is reduced to its content words and stems, exactly as for
+    knowledge search (see :func:`search_text.build_fts_query`), and
+    verified videos are ranked with column-weighted BM25 over title,
+    keywords and category.  Queries without content words get no
+    suggestions.
+
+    Results are cached until the videos are reloaded (see
+    :mod:`app.services.search_cache`).
 
     Returns a list of dicts with keys: ``title``, ``url``,
     ``channel_name``, ``category``.
     """
-    if not query or not query.strip():
-        return []
-
-    # Normalise query words
-    query_words = {
-        word.lower().strip()
-        for word in query.split()
-        if len(word.strip()) > 2  # skip very short words
-    }
-
-    if not query_words:
+    # A question of only stopwords ("o que é?") says nothing about a topic
+    if not query or not has_content_terms(query):
         return []
 
-    # Fetch all verified videos
-    result = await session.execute(
-        select(TrustedVideo).where(TrustedVideo.is_verified.is_(True))
-    )
-    videos = result.scalars().all()
-
-    # Score each video
-    scored: list[tuple[int, TrustedVideo]] = []
-    for video in videos:
-        video_keywords = {
-            kw.strip().lower() for kw in video.keywords.split(",") if kw.strip()
-        }
-        # Also include words from the title and category
-        title_words = {w.lower() for w in video.title.split() if len(w) > 2}
-        video_keywords |= title_words
-        video_keywords.add(video.category.lower())
-
-        # Count how many query words match video keywords
-        overlap = len(query_words & video_keywords)
-
-        # Also count partial matches (query word is a substring of a keyword)
-        for qw in query_words:
-            for vk in video_keywords:
-                if qw in vk or vk in qw:
-                    overlap += 1
+    fts_query = build_fts_query(query)
 
-        if overlap > 0:
-            scored.append((overlap, video))
+    cache_key = video_search_cache.key(tuple(sorted(query_terms(query))), limit)
+    cached = video_search_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    # Sort by score descending and take the top `limit`
-    scored.sort(key=lambda pair: pair[0], reverse=True)
+    try:
+        result = await session.execute(
+            text(
+                "SELECT v.title, v.url, v.channel_name, v.category "
+                "FROM trusted_videos_fts AS fts "
+                "JOIN trusted_videos AS v ON v.rowid = fts.rowid "
+                "WHERE trusted_videos_fts MATCH :query AND v.is_verified "
+                "ORDER BY bm25(trusted_videos_fts, :w_title, :w_keywords, :w_category) "
+                "LIMIT :limit"
+            ),
+            {
+                "query": fts_query,
+                "limit": limit,
+                "w_title": _BM25_WEIGHTS[0],
+                "w_keywords": _BM25_WEIGHTS[1],
+                "w_category": _BM25_WEIGHTS[2],
+            },
+        )
+    except Exception:
+        logger.exception("Video FTS5 search failed for query: %s", query)
+        return []
 
-    return [
+    results = [
         {
-            "title": video.title,
-            "url": video.url,
-            "channel_name": video.channel_name,
-            "category": video.category,
+            "title": title,
+            "url": url,
+            "channel_name": channel_name,
+            "category": category,
         }
-        for _, video in scored[:limit]
+        for title, url, channel_name, category in result.all()
     ]
+    video_search_cache.put(cache_key, results)
+    return results
@@ -7,6 +7,7 @@ import re
 
 from app.adapters.llm.base_llm import LLMRequest
 from app.adapters.llm.registry import LLMRegistry
+from app.adapters.llm.scheduler import LLMQueueFullError
 from app.config import settings
 from app.i18n import SENSITIVE_PATTERNS, STEP_PATTERNS, t
 from app.schemas.vision import VisionResponse
@@ -25,6 +26,7 @@ async def analyze_image(
     llm_registry: LLMRegistry,
     question: str | None = None,
     locale: str = "pt-BR",
+    user_id: str = "",
 ) -> VisionResponse:
     """Analyze an image using a vision-capable LLM.
 
@@ -40,23 +42,21 @@ async def analyze_image(
         Optional user question about the image.
     locale:
         Response language locale (``"pt-BR"`` or ``"en"``).
+    user_id:
+        The requesting user, for fair queuing of the upstream call.
 
     Returns
     -------
     VisionResponse
         Structured response with description, sensitivity flag, and steps.
+
+    Raises
+    ------
+    LLMQueueFullError
+        When every provider's admission queue is saturated.
     """
     adapter = llm_registry.get_default()
-
-    # Resolve the vision model based on provider
-    if adapter.provider_name == "anthropic":
-        model = settings.anthropic_vision_model
-    elif adapter.provider_name == "openai":
-        model = settings.openai_vision_model
-    elif adapter.provider_name == "ollama":
-        model = settings.ollama_vision_model
-    else:
-        model = settings.anthropic_vision_model
+    model = _resolve_vision_model(adapter.provider_name)
 
     user_content = question or t("default_image_question", locale)
 
@@ -71,7 +71,11 @@ async def analyze_image(
     )
 
     try:
-        llm_response = await adapter.complete_vision(llm_request)
+        llm_response = await llm_registry.complete(
+            llm_request, user_id, model_for=_resolve_vision_model, vision=True
+        )
+    except LLMQueueFullError:
+        raise
     except Exception:
         logger.exception("Vision LLM call failed")
         return VisionResponse(
@@ -107,3 +111,19 @@ async def analyze_image(
         has_sensitive_data=has_sensitive_data,
         steps=steps,
     )
+
+
+# ---------------------------------------------------------------------------
+# Internal helpers
+# ---------------------------------------------------------------------------
+
+
+def _resolve_vision_model(provider: str) -> str:
+    """Return the configured vision model for *provider*."""
+    if provider == "anthropic":
+        return settings.anthropic_vision_model
+    if provider == "openai":
+        return settings.openai_vision_model
+    if provider == "ollama":
+        return settings.ollama_vision_model
+    return settings.anthropic_vision_model
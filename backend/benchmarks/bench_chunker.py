@@ -0,0 +1,112 @@
+"""Benchmark the knowledge-base chunker against the previous implementation.
+
+Generates synthetic markdown shaped like the knowledge base (headings,
+short "Passo N" paragraphs, bullet lists, long prose paragraphs) at
+increasing sizes, and reports the time, chunk count and mean chunk
+length of :func:`kb_ingest.chunk_text` and of the character-window
+chunker it replaced.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_chunker
+    python -m benchmarks.bench_chunker --sizes 10000 1000000 --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+from app.services.kb_ingest import chunk_text
+
+_WORDS = (
+    "abra o aplicativo do banco toque em pix escolha a chave confirme "
+    "o valor digite sua senha nunca compartilhe codigo golpe celular "
+    "mensagem consulta posto saude boleto pagamento"
+).split()
+
+
+def _legacy_chunk_text(text_body: str, chunk_size: int = 500, overlap: int = 100) -> list[str]:
+    """The character-window chunker used before the heading-aware one."""
+    if len(text_body) <= chunk_size:
+        return [text_body.strip()] if text_body.strip() else []
+
+    chunks: list[str] = []
+    start = 0
+    length = len(text_body)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            para_break = text_body.rfind("\n\n", start, end)
+            if para_break > start:
+                end = para_break + 2
+            else:
+                for sep in (". ", ".\n", "! ", "? "):
+                    sent_break = text_body.rfind(sep, start, end)
+                    if sent_break > start:
+                        end = sent_break + len(sep)
+                        break
+        chunk = text_body[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = max(start + 1, end - overlap)
+    return chunks
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _synthetic_markdown(chars: int, rng: random.Random) -> str:
+    blocks: list[str] = []
+    size = 0
+    section = 0
+    while size < chars:
+        section += 1
+        blocks.append(f"## Secao {section}")
+        kind = section % 3
+        if kind == 0:
+            blocks.extend(f"Passo {step}: {_sentence(rng, 10)}" for step in range(1, 6))
+        elif kind == 1:
+            blocks.append("\n".join(f"- {_sentence(rng, 5)}" for _ in range(5)))
+        else:
+            blocks.append(" ".join(_sentence(rng, 15) for _ in range(rng.randint(3, 20))))
+        size = sum(len(block) + 2 for block in blocks)
+    return "\n\n".join(blocks)
+
+
+def _measure(chunker: Callable[[str], list[str]], text: str, rounds: int) -> tuple[float, list[str]]:
+    timings: list[float] = []
+    chunks: list[str] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        chunks = chunker(text)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"rounds={args.rounds} (median reported)")
+    print(f"{'chars':>10} {'chunker':>8} {'ms':>9} {'chunks':>8} {'avg chars':>10} {'out/in':>7}")
+    for chars in args.sizes:
+        text = _synthetic_markdown(chars, rng)
+        for name, chunker in (("legacy", _legacy_chunk_text), ("current", chunk_text)):
+            millis, chunks = _measure(chunker, text, args.rounds)
+            total = sum(len(chunk) for chunk in chunks)
+            print(
+                f"{len(text):>10} {name:>8} {millis:>9.1f} {len(chunks):>8} "
+                f"{total / max(len(chunks), 1):>10.0f} {total / len(text):>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark dense-index query latency at increasing corpus sizes.
+
+Builds synthetic sparse hashed vectors (similar in density to real
+chunks) and times :meth:`DenseIndex.search` end to end, i.e. query
+embedding, matrix-vector product and ``argpartition`` top-k.
+
+Usage (from ``backend/``, needs numpy)::
+
+    python -m benchmarks.bench_dense_index
+    python -m benchmarks.bench_dense_index --sizes 10000 100000 --dim 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from app.services.dense_index import DenseIndex
+
+_QUERIES = [
+    "como que eu faço pra mandar um pix pro meu neto",
+    "marcar consulta no posto de saude",
+    "como mando audio no zap",
+    "pagar conta com codigo de barras",
+    "recebi uma mensagem pedindo minha senha",
+]
+
+# Non-zero buckets per synthetic chunk vector (~ a 500-char chunk)
+_NONZERO_PER_ROW = 120
+
+# Rows generated per batch, to bound peak memory at 1M rows
+_BATCH_ROWS = 50_000
+
+
+def _synthetic_matrix(rows: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    matrix = np.zeros((rows, dim), dtype=np.float32)
+    nonzero = min(_NONZERO_PER_ROW, dim)
+    for start in range(0, rows, _BATCH_ROWS):
+        stop = min(start + _BATCH_ROWS, rows)
+        cols = rng.integers(0, dim, size=(stop - start, nonzero))
+        vals = rng.random((stop - start, nonzero), dtype=np.float32)
+        np.put_along_axis(matrix[start:stop], cols, vals, axis=1)
+    return matrix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"dim={args.dim} top_k={args.top_k} repeat={args.repeat}")
+    print(f"{'chunks':>10} {'matrix MB':>10} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for rows in args.sizes:
+        matrix = _synthetic_matrix(rows, args.dim, rng)
+        index = DenseIndex(args.dim)
+        started = time.perf_counter()
+        index.build([str(i) for i in range(rows)], matrix)
+        build_seconds = time.perf_counter() - started
+
+        timings: list[float] = []
+        for i in range(args.repeat):
+            query = _QUERIES[i % len(_QUERIES)]
+            started = time.perf_counter()
+            index.search(query, args.top_k)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+        print(
+            f"{rows:>10} {matrix.nbytes / 2**20:>10.0f} {build_seconds:>8.2f} "
+            f"{statistics.median(timings):>8.2f} {p95:>8.2f}"
+        )
+        del index, matrix
+
+
+if __name__ == "__main__":
+    main()
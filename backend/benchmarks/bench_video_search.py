@@ -0,0 +1,154 @@
+"""Benchmark trusted-video seeding and search at increasing catalog sizes.
+
+Generates synthetic catalogs shaped like ``data/trusted_videos.json`` (a
+title, a category and ~8 comma-separated keywords from a shared
+vocabulary) in a temporary SQLite database, and times:
+
+* :func:`video_service.load_trusted_videos` on an empty table, again
+  with nothing changed, and with 1% of the entries edited;
+* :func:`video_service.search_videos` (FTS5, result cache bypassed)
+  against the full in-Python scan it replaced, which is shown without
+  the cost of loading every row, so it is a lower bound.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_video_search
+    python -m benchmarks.bench_video_search --sizes 100 10000 --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.models.trusted_video import TrustedVideo
+from app.services import video_service
+from app.services.search_cache import video_search_cache
+
+_VOCABULARY = (
+    "pix whatsapp banco cartao senha golpe celular mensagem audio video "
+    "chamada foto consulta sus saude boleto pagamento transferencia app "
+    "aplicativo seguranca internet email conta gov documento receita "
+    "vacina agendamento uber mapa netflix youtube camera contato"
+).split()
+_CATEGORIES = ("banco", "comunicacao", "saude", "seguranca", "governo", "lazer")
+
+_QUERIES = [
+    "como que eu faço pra mandar um pix pro meu neto",
+    "marcar consulta no posto de saude",
+    "como mando audio no whatsapp",
+    "pagar boleto com codigo de barras",
+    "recebi uma mensagem pedindo minha senha do banco",
+]
+
+
+def _legacy_search(videos: list[dict], query: str, limit: int) -> list[str]:
+    """The full-scan scorer used before FTS5 (returns URLs)."""
+    query_words = {w.lower().strip() for w in query.split() if len(w.strip()) > 2}
+    scored = []
+    for video in videos:
+        video_keywords = {kw.strip().lower() for kw in video["keywords"].split(",") if kw.strip()}
+        video_keywords |= {w.lower() for w in video["title"].split() if len(w) > 2}
+        video_keywords.add(video["category"].lower())
+        overlap = len(query_words & video_keywords)
+        for qw in query_words:
+            for vk in video_keywords:
+                if qw in vk or vk in qw:
+                    overlap += 1
+        if overlap > 0:
+            scored.append((overlap, video))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [video["url"] for _, video in scored[:limit]]
+
+
+def _catalog(size: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "title": " ".join(rng.sample(_VOCABULARY, 4)).capitalize() + f" parte {i}",
+            "url": f"https://example.com/watch?v={i}",
+            "channel_name": "Canal",
+            "category": rng.choice(_CATEGORIES),
+            "keywords": ", ".join(rng.sample(_VOCABULARY, 8)),
+        }
+        for i in range(size)
+    ]
+
+
+async def _bench_size(size: int, args: argparse.Namespace, rng: random.Random, tmp: Path) -> None:
+    videos = _catalog(size, rng)
+    seed_path = tmp / f"videos_{size}.json"
+    settings.trusted_videos_path = str(seed_path)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp / f'videos_{size}.db'}")
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(TrustedVideo.__table__.create)
+    await video_service.init_video_fts(engine)
+
+    async def load() -> float:
+        started = time.perf_counter()
+        async with sessions() as session:
+            await video_service.load_trusted_videos(session)
+        return (time.perf_counter() - started) * 1000
+
+    seed_path.write_text(json.dumps(videos))
+    insert_ms = await load()
+    noop_ms = await load()
+    for video in videos[: max(1, size // 100)]:
+        video["keywords"] += ", editado"
+    seed_path.write_text(json.dumps(videos))
+    update_ms = await load()
+
+    fts_timings: list[float] = []
+    scan_timings: list[float] = []
+    async with sessions() as session:
+        for i in range(args.repeat):
+            query = _QUERIES[i % len(_QUERIES)]
+            video_search_cache.bump()
+            started = time.perf_counter()
+            await video_service.search_videos(session, query, args.limit)
+            fts_timings.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            _legacy_search(videos, query, args.limit)
+            scan_timings.append((time.perf_counter() - started) * 1000)
+    await engine.dispose()
+
+    scan_ms = statistics.median(scan_timings)
+    fts_ms = statistics.median(fts_timings)
+    print(
+        f"{size:>8} {insert_ms:>9.0f} {noop_ms:>8.0f} {update_ms:>9.0f} "
+        f"{scan_ms:>9.3f} {fts_ms:>8.3f} {scan_ms / fts_ms:>7.0f}x"
+    )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    rng = random.Random(0)
+    print(f"limit={args.limit} repeat={args.repeat} (load: ms per call; search: median ms)")
+    print(
+        f"{'videos':>8} {'insert':>9} {'no-op':>8} {'update 1%':>9} "
+        f"{'scan':>9} {'fts5':>8} {'speedup':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            await _bench_size(size, args, rng, Path(tmp))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 1_000, 10_000, 50_000])
+    parser.add_argument("--limit", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()